@@ -0,0 +1,350 @@
+from Maze import Maze
+import weakref
+import numpy as np
+
+
+class ClusterGraph:
+    """
+    Class for the abstract graph of hierarchical path finding (HPA*). The maze is split into square clusters, every
+    maximal run of open cells facing each other across the border of two clusters is an entrance with one transition in
+    its middle, or one at each end for runs of 6 cells and more. The cells of the transitions are the nodes of the graph,
+    joined by the transitions themselves (cost 1) and inside every cluster by their shortest distances within the
+    cluster, so a path between far apart cells is found on a graph much smaller than the maze.
+    Changed walls are found by comparing the maze with the walls seen on the last refresh, or reported with update_cells,
+    which spares the next refresh the comparison, and only the clusters whose cells or entrances changed are recomputed.
+    .............
+    Attributes:
+        maze: weak proxy of the maze the graph abstracts, so a graph cached for a maze does not keep it alive
+        cluster_size: side of a cluster in cells
+        nodes: dictionary from cluster to the array of flat indices of its nodes
+        distances: dictionary from cluster to the int16 matrix of distances between its nodes, -1 where they are not
+                   connected inside the cluster
+        transitions: dictionary from node to the nodes it faces across a border
+        recomputed: number of clusters recomputed by the last build or update
+    Methods:
+        build: Computes the graph of the whole maze.
+        refresh: Updates the graph to the current walls of the maze.
+        update_cells: Updates the graph after the given cells changed.
+        cluster: Returns the cluster of a cell.
+        bounds: Returns the cells covered by a cluster.
+        links: Returns the edges of a node.
+        connect: Returns the distances from a cell to the nodes of its cluster.
+        local_distances: Computes the distances between cells inside their clusters.
+    """
+    def __init__(self, maze: Maze, cluster_size: int = 32):
+        """
+        Builds the abstract graph of a maze.
+        .............
+        Input:
+            maze: The maze to abstract, its walls are read on every refresh
+            cluster_size: Side of a cluster in cells
+        """
+        self.maze = weakref.proxy(maze)
+        self.cluster_size = cluster_size
+        self.build()
+
+    def build(self):
+        """
+        Computes the graph of the whole maze.
+        """
+        walls = self.maze.walls
+        size = self.cluster_size
+        self.width, self.height = walls.shape
+        self.columns = -(-self.width // size)
+        self.rows = -(-self.height // size)
+        self.open = np.zeros((self.columns * size, self.rows * size), dtype=bool)
+        self.open[:self.width, :self.height] = walls != 1
+        self.borders = {}
+        self.transitions = {}
+        self.nodes = {}
+        self.ordinals = {}
+        self.distances = {}
+        self.edges = {}
+        self.reported = False
+
+        borders = [(0, x, y) for x in range(self.columns - 1) for y in range(self.rows)]
+        borders += [(1, x, y) for x in range(self.columns) for y in range(self.rows - 1)]
+        self.update_borders(borders)
+        self.update_clusters(range(self.columns * self.rows))
+
+    def refresh(self):
+        """
+        Updates the graph to the current walls of the maze, the whole graph is rebuilt if the size of the maze changed.
+        The walls are compared with the graph unless changes were reported with update_cells since the last refresh.
+        .............
+        Output:
+            Number of clusters recomputed
+        """
+        walls = self.maze.walls
+        if walls.shape != (self.width, self.height):
+            self.build()
+            return self.recomputed
+        if self.reported:
+            self.reported = False
+            return 0
+
+        changed = np.flatnonzero((walls != 1) != self.open[:self.width, :self.height])
+        self.recomputed = 0
+        if changed.size:
+            self.update_cells(zip(*np.divmod(changed, self.height)))
+        self.reported = False
+        return self.recomputed
+
+    def update_cells(self, positions):
+        """
+        Updates the graph after the given cells changed. The entrances on the borders of their clusters are found
+        again, and the distances are recomputed in their clusters and in the clusters whose entrances changed. The next
+        refresh trusts the report and does not compare the whole grid, so every cell changed before it has to be reported.
+        .............
+        Input:
+            positions: Iterable of the changed cell positions
+        """
+        self.reported = True
+        clusters = set()
+        for x, y in positions:
+            self.open[x, y] = self.maze.walls[x, y] != 1
+            clusters.add(self.cluster(x * self.height + y))
+
+        borders = []
+        for cluster in clusters:
+            x, y = divmod(cluster, self.rows)
+            borders += [(0, x, y), (0, x - 1, y), (1, x, y), (1, x, y - 1)]
+        borders = [(axis, x, y) for axis, x, y in set(borders)
+                   if 0 <= x < self.columns - (axis == 0) and 0 <= y < self.rows - (axis == 1)]
+
+        self.update_clusters(sorted(clusters | self.update_borders(borders)))
+
+    def cluster(self, cell: int):
+        """
+        Returns the cluster of a cell.
+        .............
+        Input:
+            cell: Flat index of the cell
+        Output:
+            Number of the cluster, cluster_x * rows + cluster_y
+        """
+        x, y = divmod(cell, self.height)
+        return x // self.cluster_size * self.rows + y // self.cluster_size
+
+    def bounds(self, cluster: int):
+        """
+        Returns the cells covered by a cluster.
+        .............
+        Input:
+            cluster: Number of the cluster
+        Output:
+            Tuple (x0, x1, y0, y1) of the half-open ranges of the cluster inside the maze
+        """
+        x, y = divmod(cluster, self.rows)
+        size = self.cluster_size
+        return (x * size, min((x + 1) * size, self.width), y * size, min((y + 1) * size, self.height))
+
+    def links(self, node: int):
+        """
+        Returns the edges of a node: the nodes of its cluster it is connected to and the nodes it faces across a border.
+        .............
+        Input:
+            node: Flat index of the node
+        Output:
+            List of (node, cost) tuples
+        """
+        edges = self.edges.get(node)
+        if edges is None:
+            cluster = self.cluster(node)
+            row = self.distances[cluster][self.ordinals[node]]
+            reached = np.flatnonzero(row > 0)
+            edges = list(zip(self.nodes[cluster][reached].tolist(), row[reached].tolist()))
+            edges += [(other, 1) for other in self.transitions.get(node, ())]
+            self.edges[node] = edges
+        return edges
+
+    def connect(self, cell: int, others=()):
+        """
+        Returns the distances from a cell that need not be a node to the nodes of its cluster, used to insert the
+        starting and ending points of a query into the graph.
+        .............
+        Input:
+            cell: Flat index of an open cell
+            others: Flat indices of further cells, those in the same cluster are connected as well
+        Output:
+            List of (cell, distance) tuples of the cells reachable inside the cluster
+        """
+        cluster = self.cluster(cell)
+        cells = [cell] + [other for other in others if self.cluster(other) == cluster and other != cell]
+        cells += [node for node in self.nodes[cluster].tolist() if node not in cells]
+        row = self.local_distances([cluster], [cells])[0][0]
+        return [(other, int(distance)) for other, distance in zip(cells[1:], row[1:]) if distance > 0]
+
+    def update_borders(self, borders: list):
+        """
+        Finds the transitions of the given borders again.
+        .............
+        Input:
+            borders: List of (axis, cluster_x, cluster_y) borders, axis 0 is the border with cluster_x + 1 and axis 1
+                     the border with cluster_y + 1
+        Output:
+            Set of the clusters whose transitions changed
+        """
+        size = self.cluster_size
+        offsets = np.arange(size)
+        changed = set()
+        for axis in (0, 1):
+            keys = [border for border in borders if border[0] == axis]
+            if not keys:
+                continue
+
+            _, x, y = np.array(keys).T
+            if axis == 0:
+                line = (x + 1) * size - 1
+                across = y[:, None] * size + offsets
+                pairs = self.open[line[:, None], across] & self.open[line[:, None] + 1, across]
+            else:
+                line = (y + 1) * size - 1
+                across = x[:, None] * size + offsets
+                pairs = self.open[across, line[:, None]] & self.open[across, line[:, None] + 1]
+
+            before = np.zeros_like(pairs)
+            before[:, 1:] = pairs[:, :-1]
+            after = np.zeros_like(pairs)
+            after[:, :-1] = pairs[:, 1:]
+            border, first = np.nonzero(pairs & ~before)
+            last = np.nonzero(pairs & ~after)[1]
+
+            long = last - first >= 5
+            border = np.concatenate((border[~long], border[long], border[long]))
+            offset = np.concatenate((((first + last) // 2)[~long], first[long], last[long]))
+            position = across[border, offset]
+            if axis == 0:
+                sides = (line[border] * self.height + position, (line[border] + 1) * self.height + position)
+            else:
+                sides = (position * self.height + line[border], position * self.height + line[border] + 1)
+
+            found = {key: [] for key in keys}
+            for index, a, b in zip(border.tolist(), sides[0].tolist(), sides[1].tolist()):
+                found[keys[index]].append((a, b))
+
+            for key, transitions in found.items():
+                transitions.sort()
+                if self.borders.get(key, []) == transitions:
+                    continue
+                for a, b in self.borders.get(key, []):
+                    self.transitions[a].remove(b)
+                    self.transitions[b].remove(a)
+                for a, b in transitions:
+                    self.transitions.setdefault(a, []).append(b)
+                    self.transitions.setdefault(b, []).append(a)
+                self.borders[key] = transitions
+                _, cluster_x, cluster_y = key
+                changed.add(cluster_x * self.rows + cluster_y)
+                changed.add((cluster_x + (axis == 0)) * self.rows + cluster_y + (axis == 1))
+
+        return changed
+
+    def update_clusters(self, clusters):
+        """
+        Collects the nodes of the given clusters from their borders and recomputes the distances between them.
+        .............
+        Input:
+            clusters: Iterable of cluster numbers
+        """
+        clusters = list(clusters)
+        cells = []
+        for cluster in clusters:
+            x, y = divmod(cluster, self.rows)
+            nodes = set()
+            for key, side in (((0, x, y), 0), ((0, x - 1, y), 1), ((1, x, y), 0), ((1, x, y - 1), 1)):
+                nodes.update(pair[side] for pair in self.borders.get(key, ()))
+            for node in self.nodes.get(cluster, np.zeros(0, dtype=np.int64)).tolist():
+                del self.ordinals[node]
+                self.edges.pop(node, None)
+            cells.append(sorted(nodes))
+
+        for cluster, nodes, distances in zip(clusters, cells, self.local_distances(clusters, cells)):
+            self.nodes[cluster] = np.array(nodes, dtype=np.int64)
+            self.distances[cluster] = distances
+            self.ordinals.update((node, ordinal) for ordinal, node in enumerate(nodes))
+
+        self.recomputed = len(clusters)
+
+    def local_distances(self, clusters: list, cells: list):
+        """
+        Computes the shortest distances between the given cells of every cluster, moving inside the cluster only. All
+        clusters of a batch are searched at once by breadth-first search over bit sets: every cell holds one bit per
+        source cell of its cluster, so one step of the search is a few shifts of the whole batch. Clusters whose search
+        is over are dropped from the batch every few steps.
+        .............
+        Input:
+            clusters: List of cluster numbers
+            cells: List with the list of flat indices of open cells of every cluster
+        Output:
+            List with the int16 distance matrix of every cluster, -1 where two cells are not connected inside it
+        """
+        size = self.cluster_size
+        blocks = self.open.reshape(self.columns, size, self.rows, size)
+        words = max(1, -(-max((len(group) for group in cells), default=0) // 64))
+        batch = max(1, 2**22 // (size * size * words))
+        results = []
+
+        for begin in range(0, len(clusters), batch):
+            groups = cells[begin:begin + batch]
+            x, y = np.divmod(np.array(clusters[begin:begin + batch], dtype=np.int64), self.rows)
+            counts = [len(group) for group in groups]
+            count = max(counts, default=0)
+            if count == 0:
+                results += [np.zeros((0, 0), dtype=np.int16) for _ in groups]
+                continue
+
+            owner = np.repeat(np.arange(len(groups)), counts)
+            ordinal = np.concatenate([np.arange(length) for length in counts])
+            local_x, local_y = np.divmod(np.concatenate(groups).astype(np.int64), self.height)
+            local_x -= x[owner] * size
+            local_y -= y[owner] * size
+
+            passable = np.where(blocks[x, :, y, :], np.uint64(2**64 - 1), np.uint64(0))
+            reached = np.zeros((words, len(groups), size, size), dtype=np.uint64)
+            reached[ordinal // 64, owner, local_x, local_y] = np.left_shift(np.uint64(1), (ordinal % 64).astype(np.uint64))
+            front = reached.copy()
+            spread = np.empty_like(front)
+            distances = np.full((len(groups), count, count), -1, dtype=np.int16)
+            distances[owner, ordinal, ordinal] = 0
+            active = np.arange(len(groups))
+            slot = owner
+
+            step = 0
+            while True:
+                step += 1
+                spread[..., :1, :] = 0
+                spread[..., 1:, :] = front[..., :-1, :]
+                spread[..., :-1, :] |= front[..., 1:, :]
+                spread[..., 1:] |= front[..., :-1]
+                spread[..., :-1] |= front[..., 1:]
+                spread &= passable
+                spread &= ~reached
+                if not spread.any():
+                    break
+                reached |= spread
+                front, spread = spread, front
+
+                values = front[:, slot, local_x, local_y]
+                hit = np.flatnonzero(values.any(axis=0))
+                if hit.size:
+                    bits = np.ascontiguousarray(values[:, hit].T).view(np.uint8)
+                    target, source = np.nonzero(np.unpackbits(bits, axis=1, bitorder="little"))
+                    distances[owner[hit[target]], source, ordinal[hit[target]]] = step
+
+                if step % 16 == 0:
+                    spreading = front.any(axis=(0, 2, 3))
+                    if spreading.sum() * 2 < len(active):
+                        keep = np.flatnonzero(spreading)
+                        slots = np.full(len(active), -1)
+                        slots[keep] = np.arange(len(keep))
+                        kept = np.flatnonzero(spreading[slot])
+                        active, slot = active[keep], slots[slot[kept]]
+                        owner, ordinal = owner[kept], ordinal[kept]
+                        local_x, local_y = local_x[kept], local_y[kept]
+                        passable, reached, front = passable[keep], reached[:, keep], front[:, keep]
+                        spread = np.empty_like(front)
+
+            results += [distances[index, :length, :length].copy() for index, length in enumerate(counts)]
+
+        return results
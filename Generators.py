@@ -0,0 +1,309 @@
+from array import array
+import numpy as np
+import random
+
+
+def room_grid(width: int, height: int):
+    """
+    Lays out the rooms of a perfect maze: every cell with odd x and y inside the border is a room and the cells between
+    two rooms are the walls a generator can remove
+    INPUT:
+        width: int
+            width of the maze in cells
+        height: int
+            height of the maze in cells
+    OUTPUT:
+        walls: bytearray
+            flat cells (x * height + y), 1 for walls and 0 for rooms
+        rooms: tuple
+            number of rooms along x and along y
+    """
+    columns, rows = max((width - 1) // 2, 0), max((height - 1) // 2, 0)
+    walls = np.ones((width, height), dtype=np.uint8)
+    walls[1:2 * columns:2, 1:2 * rows:2] = 0
+    return bytearray(walls.tobytes()), (columns, rows)
+
+
+def neighbor_rooms(cell: int, height: int, rooms: tuple):
+    """
+    Returns the rooms next to a room
+    INPUT:
+        cell: int
+            flat index of the room
+        height: int
+            height of the maze in cells
+        rooms: tuple
+            number of rooms along x and along y
+    OUTPUT:
+        neighbors: list[int]
+            flat indices of the neighbouring rooms, the wall between two rooms is at the mean of their indices
+    """
+    x, y = divmod(cell, height)
+    neighbors = []
+    if x > 1:
+        neighbors.append(cell - 2 * height)
+    if x < 2 * rooms[0] - 1:
+        neighbors.append(cell + 2 * height)
+    if y > 1:
+        neighbors.append(cell - 2)
+    if y < 2 * rooms[1] - 1:
+        neighbors.append(cell + 2)
+    return neighbors
+
+
+def python_random(rng: np.random.Generator):
+    """
+    Seeds a random.Random from a NumPy generator, drawing single numbers from it is much cheaper inside Python loops
+    INPUT:
+        rng: np.random.Generator
+    OUTPUT:
+        random: callable
+            returns a float in [0, 1)
+    """
+    return random.Random(int(rng.integers(2**63))).random
+
+
+def to_walls(walls: bytearray, width: int, height: int):
+    """
+    Converts flat cells into the walls array of a Maze
+    INPUT:
+        walls: bytearray
+            flat cells, 1 for walls and 0 for open cells
+        width: int
+        height: int
+    OUTPUT:
+        walls: np.ndarray
+            uint8 array of shape (width, height)
+    """
+    return np.frombuffer(walls, dtype=np.uint8).reshape(width, height).copy()
+
+
+def kruskal(width: int, height: int, rng: np.random.Generator):
+    """
+    Generates a perfect maze as the minimum spanning tree of the rooms under random edge weights, which is the maze
+    randomized Kruskal gives. The tree is built with Borůvka rounds on whole arrays: every component takes its
+    cheapest edge to another component, then the joined components are merged by pointer jumping. Each round at
+    least halves the number of components, so a 4096x4096 maze takes a few seconds. Ties between the random weights are
+    broken by the position of the edge, which keeps every cheapest edge unique.
+    INPUT:
+        width: int
+            width of the maze in cells
+        height: int
+            height of the maze in cells
+        rng: np.random.Generator
+            generator of the edge weights
+    OUTPUT:
+        walls: np.ndarray
+            uint8 array of shape (width, height), 1 for walls and 0 for open cells
+    """
+    walls, (columns, rows) = room_grid(width, height)
+    walls = to_walls(walls, width, height)
+    if columns * rows <= 1:
+        return walls
+
+    rooms = np.arange(columns * rows, dtype=np.int64).reshape(columns, rows)
+    cells = (2 * (rooms // rows) + 1) * height + 2 * (rooms % rows) + 1
+    first = np.concatenate((rooms[:-1].ravel(), rooms[:, :-1].ravel()))
+    second = np.concatenate((rooms[1:].ravel(), rooms[:, 1:].ravel()))
+    between = np.concatenate(((cells[:-1] + height).ravel(), (cells[:, :-1] + 1).ravel()))
+    weights = rng.integers(0, 2**31, len(first), dtype=np.int64) << 32
+
+    parent = np.arange(columns * rows, dtype=np.int64)
+    cheapest = np.empty(columns * rows, dtype=np.int64)
+    opened = []
+
+    while True:
+        outer = first != second
+        first, second, between, weights = first[outer], second[outer], between[outer], weights[outer]
+        if not len(first):
+            break
+
+        keys = weights | np.arange(len(first))
+        cheapest.fill(np.iinfo(np.int64).max)
+        np.minimum.at(cheapest, first, keys)
+        np.minimum.at(cheapest, second, keys)
+        components = np.flatnonzero(cheapest != np.iinfo(np.int64).max)
+        picked = cheapest[components] & 0xFFFFFFFF
+        other = np.where(first[picked] == components, second[picked], first[picked])
+        parent[components] = other
+        roots = components[(parent[other] == components) & (components < other)]
+        parent[roots] = roots
+        chosen = np.zeros(len(first), dtype=bool)
+        chosen[picked] = True
+        opened.append(between[chosen])
+
+        while True:
+            jumped = parent[parent[components]]
+            if np.array_equal(jumped, parent[components]):
+                break
+            parent[components] = jumped
+        first, second = parent[first], parent[second]
+
+    walls.reshape(-1)[np.concatenate(opened)] = 0
+    return walls
+
+
+def backtracker(width: int, height: int, rng: np.random.Generator):
+    """
+    Generates a perfect maze with the recursive backtracker, a randomized depth-first search kept on an explicit
+    stack so the size of the maze is not bound by the recursion limit
+    INPUT:
+        width: int
+            width of the maze in cells
+        height: int
+            height of the maze in cells
+        rng: np.random.Generator
+            generator of the random choices
+    OUTPUT:
+        walls: np.ndarray
+            uint8 array of shape (width, height), 1 for walls and 0 for open cells
+    """
+    walls, rooms = room_grid(width, height)
+    if rooms[0] * rooms[1] == 0:
+        return to_walls(walls, width, height)
+
+    pick = python_random(rng)
+    visited = bytearray(width * height)
+    cell = (2 * int(pick() * rooms[0]) + 1) * height + 2 * int(pick() * rooms[1]) + 1
+    visited[cell] = 1
+    stack = [cell]
+
+    while stack:
+        cell = stack[-1]
+        options = [neighbor for neighbor in neighbor_rooms(cell, height, rooms) if not visited[neighbor]]
+        if not options:
+            stack.pop()
+            continue
+
+        neighbor = options[int(pick() * len(options))]
+        walls[(cell + neighbor) // 2] = 0
+        visited[neighbor] = 1
+        stack.append(neighbor)
+
+    return to_walls(walls, width, height)
+
+
+def prim(width: int, height: int, rng: np.random.Generator):
+    """
+    Generates a perfect maze with randomized Prim: the maze grows from one room by opening a random wall of its
+    frontier at every step
+    INPUT:
+        width: int
+            width of the maze in cells
+        height: int
+            height of the maze in cells
+        rng: np.random.Generator
+            generator of the random choices
+    OUTPUT:
+        walls: np.ndarray
+            uint8 array of shape (width, height), 1 for walls and 0 for open cells
+    """
+    walls, rooms = room_grid(width, height)
+    if rooms[0] * rooms[1] == 0:
+        return to_walls(walls, width, height)
+
+    pick = python_random(rng)
+    inside = bytearray(width * height)
+    cell = (2 * int(pick() * rooms[0]) + 1) * height + 2 * int(pick() * rooms[1]) + 1
+    inside[cell] = 1
+    frontier = [(cell, neighbor) for neighbor in neighbor_rooms(cell, height, rooms)]
+
+    while frontier:
+        index = int(pick() * len(frontier))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        cell, room = frontier.pop()
+        if inside[room]:
+            continue
+
+        inside[room] = 1
+        walls[(cell + room) // 2] = 0
+        frontier.extend((room, neighbor) for neighbor in neighbor_rooms(room, height, rooms) if not inside[neighbor])
+
+    return to_walls(walls, width, height)
+
+
+def wilson(width: int, height: int, rng: np.random.Generator):
+    """
+    Generates a uniform spanning tree maze with Wilson's algorithm: random walks from every room outside the maze
+    until they hit it, loops are erased by remembering only the last exit taken from every room
+    INPUT:
+        width: int
+            width of the maze in cells
+        height: int
+            height of the maze in cells
+        rng: np.random.Generator
+            generator of the random choices
+    OUTPUT:
+        walls: np.ndarray
+            uint8 array of shape (width, height), 1 for walls and 0 for open cells
+    """
+    walls, rooms = room_grid(width, height)
+    if rooms[0] * rooms[1] == 0:
+        return to_walls(walls, width, height)
+
+    pick = python_random(rng)
+    inside = bytearray(width * height)
+    exits = array("q", [0]) * (width * height)
+    inside[(2 * int(pick() * rooms[0]) + 1) * height + 2 * int(pick() * rooms[1]) + 1] = 1
+
+    for x in range(1, 2 * rooms[0], 2):
+        for start in range(x * height + 1, x * height + 2 * rooms[1], 2):
+            cell = start
+            while not inside[cell]:
+                options = neighbor_rooms(cell, height, rooms)
+                exits[cell] = options[int(pick() * len(options))]
+                cell = exits[cell]
+
+            cell = start
+            while not inside[cell]:
+                inside[cell] = 1
+                walls[(cell + exits[cell]) // 2] = 0
+                cell = exits[cell]
+
+    return to_walls(walls, width, height)
+
+
+def braid(walls: np.ndarray, rng: np.random.Generator, fraction: float):
+    """
+    Removes dead ends of a perfect maze, which adds loops and so more than one way between two cells. Every dead end
+    is kept or opened independently, an opened dead end loses a random wall towards another room.
+    INPUT:
+        walls: np.ndarray
+            walls of a perfect maze as returned by a generator, changed in place
+        rng: np.random.Generator
+            generator of the random choices
+        fraction: float
+            probability of removing a dead end, 1 removes all of them
+    OUTPUT:
+        walls: np.ndarray
+            the braided walls
+    """
+    width, height = walls.shape
+    columns, rows = max((width - 1) // 2, 0), max((height - 1) // 2, 0)
+    if columns * rows <= 1 or fraction <= 0:
+        return walls
+
+    sides = np.stack((
+        walls[0:2 * columns - 1:2, 1:2 * rows:2],
+        walls[2:2 * columns + 1:2, 1:2 * rows:2],
+        walls[1:2 * columns:2, 0:2 * rows - 1:2],
+        walls[1:2 * columns:2, 2:2 * rows + 1:2],
+    ), axis=2) == 1
+    dead_ends = (sides.sum(axis=2) == 3) & (rng.random((columns, rows)) < fraction)
+
+    removable = sides.copy()
+    removable[0, :, 0] = removable[-1, :, 1] = removable[:, 0, 2] = removable[:, -1, 3] = False
+    keys = np.where(removable, rng.random(removable.shape), -1.0)
+    x, y = np.nonzero(dead_ends & (keys.max(axis=2) >= 0))
+    direction = keys[x, y].argmax(axis=1)
+    offsets = np.array([[-1, 0], [1, 0], [0, -1], [0, 1]])
+    walls[2 * x + 1 + offsets[direction, 0], 2 * y + 1 + offsets[direction, 1]] = 0
+    return walls
+
+
+GENERATORS = {
+    "kruskal": kruskal,
+    "backtracker": backtracker,
+    "prim": prim,
+    "wilson": wilson,
+}
@@ -1,9 +1,13 @@
-from PySide6.QtWidgets import QMainWindow, QHBoxLayout, QWidget, QToolBar, QSizePolicy
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QMainWindow, QHBoxLayout, QWidget, QToolBar, QSizePolicy, QSlider, QLabel, QFileDialog, QMessageBox
+from PySide6.QtCore import Qt, QThreadPool
 from PySide6.QtGui import QIcon
-from MazePlot import MazeWidget
+from MazePlot import MazeWidget, Task
 from Maze import Maze
-import copy
+from SolveCache import SolveCache
+import MazeFile
+from functools import partial
+
+FILE_FILTER = 'Maze files (*.maze);;Text files (*.txt);;PNG images (*.png);;All files (*)'
 
 class MainPanel(QWidget):
     """
@@ -19,11 +23,27 @@ class MainPanel(QWidget):
             the maze that will be generated and then displayed    
         maze_widget: MazeWidget
             the widget that fully contains the maze and it is responsible for updating the maze
+        cache: SolveCache
+            the search results of the mazes already solved, so clicking an algorithm again does not solve the maze again
+        task: Task
+            the maze generation running in the background, None when no maze is being generated
+        duration: float
+            seconds the replay of a search takes
     Metheods:
         display_maze(clicked: str):
             Resets the maze to the original maze and generates a new path
         regenerate_maze(clicked: str):
             generates a new empty maze
+        show_maze(new_maze: Maze):
+            replaces the displayed maze with a generated one
+        replace_maze(new_maze: Maze):
+            replaces the displayed maze
+        open_maze(path: str):
+            displays a maze read from a file
+        save_maze(path: str):
+            writes the displayed maze to a file
+        set_duration(duration: float):
+            changes the speed of the replay
     """
     def __init__(self):
         """
@@ -39,7 +59,10 @@ class MainPanel(QWidget):
         self.height = size.height()
         self.width = size.width()
         self.maze = Maze(30, 0.7, self.width/self.height)
-        self.maze_widget = MazeWidget(self.maze, (self.height, self.width))
+        self.cache = SolveCache()
+        self.task = None
+        self.duration = 5.0
+        self.maze_widget = MazeWidget(self.maze, (self.height, self.width), self.cache, duration=self.duration)
         self.main_layout.addStretch()
         self.main_layout.addWidget(self.maze_widget)
         self.main_layout.addStretch()
@@ -56,26 +79,94 @@ class MainPanel(QWidget):
         OUTPUT:
             ....
         """
-        self.maze_widget.maze = copy.deepcopy(self.maze_widget.unsearched_maze)
+        self.task = None
+        self.maze_widget.maze.clear_overlay()
         self.maze_widget.get_path(method=clicked)
+        self.maze_widget.repaint_maze()
     
     def regenerate_maze(self, clicked='reg'):
         """
-        genertes a new empty maze and removes the previews maze
+        genertes a new empty maze on a worker thread with the generator of the current maze, it replaces the previews maze once it is ready
         INPUT:
             clicked: str
                 takes a 'reg' string
         OUTPUT:
             ....
         """
-        new_maze = Maze(self.maze_widget.maze.height, self.maze_widget.maze.coverage, self.maze_widget.maze.aspect_ratio)
-        new_maze_widget = MazeWidget(new_maze, (self.height, self.width))
+        maze = self.maze_widget.maze
+        self.maze_widget.cancel()
+        generate = partial(Maze, generator=maze.generator, braid=maze.braid)
+        self.task = Task(generate, maze.height, maze.coverage, maze.aspect_ratio)
+        self.task.signals.finished.connect(self.show_maze)
+        QThreadPool.globalInstance().start(self.task)
+
+    def show_maze(self, new_maze: Maze):
+        """
+        removes the previews maze and displays the generated one, mazes of earlier clicks are dropped
+        INPUT:
+            new_maze: Maze
+                the generated maze
+        OUTPUT:
+            ....
+        """
+        if self.task is None or self.sender() is not self.task.signals:
+            return
+
+        self.task = None
+        self.replace_maze(new_maze)
+
+    def replace_maze(self, new_maze: Maze):
+        """
+        removes the previews maze widget and displays the given maze in a new one
+        INPUT:
+            new_maze: Maze
+                the maze to display
+        OUTPUT:
+            ....
+        """
+        new_maze_widget = MazeWidget(new_maze, (self.height, self.width), self.cache, duration=self.duration)
         index = self.main_layout.indexOf(self.maze_widget)
         self.main_layout.removeWidget(self.maze_widget)
         self.maze_widget.deleteLater()
         self.maze_widget = new_maze_widget
         self.main_layout.insertWidget(index, self.maze_widget)
-        self.maze_widget.get_path(method=clicked)
+
+    def open_maze(self, path: str):
+        """
+        displays a maze read from a file, a maze being generated is dropped
+        INPUT:
+            path: str
+                the maze file, its format is given by the extension
+        OUTPUT:
+            ....
+        """
+        new_maze = MazeFile.load(path)
+        self.task = None
+        self.maze_widget.cancel()
+        self.replace_maze(new_maze)
+
+    def save_maze(self, path: str):
+        """
+        writes the walls, starting and ending points of the displayed maze to a file
+        INPUT:
+            path: str
+                the maze file, its format is given by the extension
+        OUTPUT:
+            ....
+        """
+        MazeFile.save(self.maze_widget.maze, path)
+
+    def set_duration(self, duration: float):
+        """
+        changes how many seconds the replay of a search takes, a replay in progress speeds up or slows down at once
+        INPUT:
+            duration: float
+                seconds the replay takes
+        OUTPUT:
+            ....
+        """
+        self.duration = duration
+        self.maze_widget.duration = duration
 
 
 
@@ -86,9 +177,17 @@ class mainWindow(QMainWindow):
     Attributes:
     main_panel: MainPanel
         the widget that will react to actions
+    speed_label: QLabel
+        shows the replay duration chosen with the speed slider
     methods:
         checked(action: str):
             controls the actions flow of the tool bar
+        open_file():
+            asks for a maze file and displays it
+        save_file():
+            asks for a file name and saves the displayed maze to it
+        set_speed(seconds: int):
+            applies the replay duration chosen with the speed slider
     """
     def __init__(self):
         """
@@ -133,23 +232,56 @@ class mainWindow(QMainWindow):
         action_4.setIconText('A*'.title())
         tool_bar.addSeparator()
 
+        action_6 = tool_bar.addAction('jump point search'.title())
+        action_6.triggered.connect(lambda : self.checked('JPS'))
+        action_6.setIcon(QIcon("Icons/jump.png"))
+        action_6.setIconText('jump point search'.title())
+        tool_bar.addSeparator()
+
         action_5 = tool_bar.addAction('regenerate'.title())
         action_5.triggered.connect(lambda : self.checked('reg'))
         action_5.setIcon(QIcon("Icons/regenerate.png"))
         action_5.setIconText('regenerate'.title())
         tool_bar.addSeparator()
 
+        action_7 = tool_bar.addAction('open'.title())
+        action_7.triggered.connect(lambda : self.checked('open'))
+        action_7.setIcon(QIcon.fromTheme('document-open'))
+        action_7.setIconText('open'.title())
+        tool_bar.addSeparator()
+
+        action_8 = tool_bar.addAction('save'.title())
+        action_8.triggered.connect(lambda : self.checked('save'))
+        action_8.setIcon(QIcon.fromTheme('document-save'))
+        action_8.setIconText('save'.title())
+        tool_bar.addSeparator()
+
         spacer_end = QWidget()
         spacer_end.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         tool_bar.addWidget(spacer_end)
 
         self.addToolBar(Qt.LeftToolBarArea, tool_bar)
 
+        speed_bar = QToolBar()
+        speed_bar.setMovable(False)
+        self.speed_label = QLabel()
+        speed_bar.addWidget(self.speed_label)
+        speed_slider = QSlider(Qt.Horizontal)
+        speed_slider.setRange(1, 30)
+        speed_slider.setValue(round(self.main_panel.duration))
+        speed_slider.setMaximumWidth(200)
+        speed_slider.setToolTip('seconds the replay of a search takes')
+        speed_slider.valueChanged.connect(self.set_speed)
+        speed_bar.addWidget(speed_slider)
+        self.set_speed(speed_slider.value())
+        self.addToolBar(Qt.TopToolBarArea, speed_bar)
+
         self.setWindowTitle('Maze Generator')
 
         spacing = 20
         tool_bar.setStyleSheet(f"QToolBar {{spacing: {spacing}px;}}")
         tool_bar.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
+        self.setMinimumHeight(tool_bar.sizeHint().height() + speed_bar.sizeHint().height())
 
         self.move(400, 130)
 
@@ -166,5 +298,53 @@ class mainWindow(QMainWindow):
         """
         if action == 'reg':
             self.main_panel.regenerate_maze(action)
+        elif action == 'open':
+            self.open_file()
+        elif action == 'save':
+            self.save_file()
         else:
-            self.main_panel.display_maze(action)
\ No newline at end of file
+            self.main_panel.display_maze(action)
+
+    def open_file(self):
+        """
+        asks for a maze file and displays it, files that cannot be read are reported in a message box
+        INPUT:
+            ....
+        OUTPUT:
+            ....
+        """
+        path, _ = QFileDialog.getOpenFileName(self, 'Open Maze', '', FILE_FILTER)
+        if not path:
+            return
+        try:
+            self.main_panel.open_maze(path)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, 'Open Maze', str(error))
+
+    def save_file(self):
+        """
+        asks for a file name and saves the displayed maze to it, the format is given by the extension
+        INPUT:
+            ....
+        OUTPUT:
+            ....
+        """
+        path, _ = QFileDialog.getSaveFileName(self, 'Save Maze', 'maze.maze', FILE_FILTER)
+        if not path:
+            return
+        try:
+            self.main_panel.save_maze(path)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, 'Save Maze', str(error))
+
+    def set_speed(self, seconds: int):
+        """
+        applies the replay duration chosen with the speed slider
+        INPUT:
+            seconds: int
+                seconds the replay of a search takes
+        OUTPUT:
+            ....
+        """
+        self.speed_label.setText(f'Replay {seconds} s')
+        self.main_panel.set_duration(seconds)
\ No newline at end of file
@@ -1,20 +1,127 @@
+from Wavefront import wavefront
+from Generators import GENERATORS, braid
+from collections import OrderedDict
+import numpy as np
 import random
-import time
+import copy
+import weakref
+
+class GridView:
+    """
+    Class for the writable cell values of a maze behind the compatibility accessor `maze.maze`, indexed as `[x][y]` or `[x, y]`.
+    Reading a cell combines its wall and its overlay. Writing 1 adds a wall through set_wall, writing another value removes the wall
+    of the cell and stores the value in the overlay, so snapshots sharing the walls and the caches derived from them stay correct.
+    .............
+    Methods:
+        __init__: Initializes the view of the whole maze or of one column.
+        __getitem__: Returns a cell value, or the view of a column.
+        __setitem__: Writes a cell value.
+        __array__: Returns the cell values as a NumPy array.
+    """
+    def __init__(self, maze, x: int = None):
+        """
+        Initializes the view of the whole maze or of one column.
+        .............
+        Input:
+            maze: The maze to view
+            x: Column of the view, None for the whole maze
+        """
+        self.maze = maze
+        self.x = x
+
+    def __len__(self):
+        return self.maze.width if self.x is None else self.maze.height
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    @property
+    def shape(self):
+        return self.maze.walls.shape if self.x is None else (self.maze.height,)
+
+    def position(self, index):
+        """
+        Returns the cell position of an index of the view.
+        .............
+        Input:
+            index: y for a column view, (x, y) for the whole maze
+        Output:
+            Cell position, None when a column of the whole maze is indexed
+        """
+        if self.x is not None:
+            return (self.x, index)
+        return tuple(index) if isinstance(index, tuple) else None
+
+    def __getitem__(self, index):
+        """
+        Returns a cell value, or the view of a column.
+        .............
+        Input:
+            index: y for a column view, x or (x, y) for the whole maze
+        Output:
+            Cell value 0 to 5, or GridView of the column x
+        """
+        position = self.position(index)
+        if position is None:
+            return GridView(self.maze, range(self.maze.width)[index])
+        return int(max(self.maze.walls[position], self.maze.overlay[position]))
+
+    def __setitem__(self, index, value):
+        """
+        Writes a cell value.
+        .............
+        Input:
+            index: y for a column view, (x, y) for the whole maze
+            value: Cell value 0 to 5
+        """
+        position = self.position(index)
+        if position is None:
+            raise TypeError("a whole column cannot be assigned, index the cell as maze.maze[x][y] or maze.maze[x, y]")
+        self.maze.set_wall(position, value == 1)
+        if value != 1:
+            self.maze.overlay[position] = value
+
+    def __array__(self, dtype=None, copy=None):
+        grid = self.maze.grid if self.x is None else self.maze.grid[self.x]
+        return grid if dtype is None else grid.astype(dtype)
+
 
 class Maze:
     """
     Class for generating a maze and managing the starting, ending points, and path display within the maze.
+    The maze is stored in two NumPy uint8 arrays of shape (width, height) holding one byte per cell: `walls` holds 1 for walls and 0 for open cells,
+    `overlay` holds the display state (start=2, end=3, path=4, visited=5) and 0 elsewhere. Solvers only read `walls`, so snapshots of a maze
+    share it and only copy it when one of them changes a wall; `grid` combines both into the cell values of a single grid.
+    All random draws come from the generator owned by the maze, so the same seed always gives the same grid, starting and ending points.
     .............
     Methods:
         __init__: Initializes the maze with given size, coverage, and aspect ratio.
-        generate_maze: Generates a maze based on specified coverage.
+        from_array: Creates a maze from an existing grid.
+        from_walls: Creates a maze around an existing walls array without copying it.
+        grid: Returns the combined cell values of the walls and the overlay.
+        maze: Compatibility accessor returning a writable GridView for `maze.maze[x][y]` indexing.
+        snapshot: Returns a maze sharing the walls with an overlay of its own.
+        clear_overlay: Removes the path and visited cells from the overlay.
+        set_wall: Adds or removes a wall, copying the walls first if they are shared.
+        generate_maze: Generates a maze based on specified coverage or with a perfect-maze generator.
+        label_components: Labels the connected components of the passable cells.
+        components: Returns the cached component labels of the maze.
+        is_reachable: Checks whether two cells lie in the same connected component.
+        component_mask: Returns the cells of the connected component of a cell.
+        distance_field: Returns the cached distance and predecessor field of a source cell.
+        path_to: Returns a shortest path from a source cell to a target cell.
+        path_from: Returns a shortest path from a cell to a target cell.
+        invalidate: Drops the caches derived from the walls of the maze.
         set_point: Sets a point in the maze based on a given value.
         set_starting_point: Sets the starting point in the maze.
         set_ending_point: Sets the ending point in the maze.
         update_maze: Updates the maze based on a given position.
         display_path: Displays a given path in the maze.
     """
-    def __init__(self, size: int, coverage: float, aspect_ratio: float):
+    MAX_FIELDS = 8
+
+    def __init__(self, size: int, coverage: float, aspect_ratio: float, seed: int = None, rng=None, connected: bool = False,
+                 generator: str = None, braid: float = 0.0):
         """
         Initializes the maze with given size, coverage, and aspect ratio.
         .............
@@ -22,69 +129,443 @@ class Maze:
             size: Size of the maze
             coverage: Coverage ratio for maze generation
             aspect_ratio: Aspect ratio for maze dimensions
+            seed: Seed of the random generator used to generate the maze, None for a fresh one
+            rng: Optional numpy.random.Generator or random.Random to draw from instead of a seeded generator
+            connected: Place the starting and ending points in the same connected component
+            generator: Key of GENERATORS building a perfect maze, None for the random noise of the given coverage
+            braid: Share of the dead ends of a perfect maze to remove, which adds loops
         """
         self.aspect_ratio = aspect_ratio
         self.height = size
         self.width = int(size * self.aspect_ratio)
         self.coverage = coverage
-        self.maze = self.generate_maze()
+        self.seed = seed
+        self.connected = connected
+        self.generator = generator
+        self.braid = braid
+        self.rng = self.make_rng(seed, rng)
+        self.walls = self.generate_maze()
+        self.overlay = np.zeros_like(self.walls)
+        self.invalidate()
         self.starting_point = self.set_starting_point()
         self.ending_point = self.set_ending_point()
 
+    @classmethod
+    def from_array(cls, grid, starting_point=None, ending_point=None, seed: int = None):
+        """
+        Creates a maze from an existing grid instead of generating one, e.g. a grid shipped to another process as bytes.
+        .............
+        Input:
+            grid: Array of shape (width, height) with the cell values, it is copied
+            starting_point: Starting point position, defaults to the cell holding 2 or a random open cell
+            ending_point: Ending point position, defaults to the cell holding 3 or a random open cell
+            seed: Seed of the random generator used to place missing points
+        Output:
+            Maze object
+        """
+        grid = np.asarray(grid, dtype=np.uint8)
+        if starting_point is None and np.any(grid == 2):
+            starting_point = divmod(int(np.flatnonzero(grid == 2)[0]), grid.shape[1])
+        if ending_point is None and np.any(grid == 3):
+            ending_point = divmod(int(np.flatnonzero(grid == 3)[0]), grid.shape[1])
+
+        return cls.from_walls((grid == 1).view(np.uint8), starting_point, ending_point, seed)
+
+    @classmethod
+    def from_walls(cls, walls, starting_point=None, ending_point=None, seed: int = None, coverage: float = None):
+        """
+        Creates a maze that uses an existing walls array as is, e.g. a memory-mapped file, so no cell is read or copied up front.
+        .............
+        Input:
+            walls: uint8 array of shape (width, height) with 1 for walls and 0 for open cells
+            starting_point: Starting point position, defaults to a random open cell
+            ending_point: Ending point position, defaults to a random open cell
+            seed: Seed of the random generator used to place missing points
+            coverage: Share of open cells, counted from the walls when not given
+        Output:
+            Maze object
+        """
+        maze = cls.__new__(cls)
+        maze.walls = walls
+        maze.overlay = np.zeros(walls.shape, dtype=np.uint8)
+        maze.width, maze.height = walls.shape
+        maze.aspect_ratio = maze.width / maze.height
+        maze.coverage = float(np.count_nonzero(walls == 0)) / walls.size if coverage is None else coverage
+        maze.seed = seed
+        maze.connected = False
+        maze.generator = None
+        maze.braid = 0.0
+        maze.rng = cls.make_rng(seed, None)
+        maze.invalidate()
+
+        for name, value, point in (("starting_point", 2, starting_point), ("ending_point", 3, ending_point)):
+            if point is None:
+                point = maze.set_point(value, np.flatnonzero(maze.grid == 0))
+            point = (int(point[0]), int(point[1]))
+            maze.overlay[point] = value
+            setattr(maze, name, point)
+
+        return maze
+
+    @property
+    def grid(self):
+        """
+        Combines the walls and the overlay into the cell values 0 to 5.
+        The array is built on every access and is read-only, walls are changed with set_wall.
+        .............
+        Output:
+            uint8 array of shape (width, height)
+        """
+        grid = np.maximum(self.walls, self.overlay)
+        grid.flags.writeable = False
+        return grid
+
+    @grid.setter
+    def grid(self, grid):
+        """
+        Replaces the walls and the overlay of the maze.
+        .............
+        Input:
+            grid: Array of shape (width, height) with the new cell values
+        """
+        grid = np.asarray(grid, dtype=np.uint8)
+        self.walls = (grid == 1).view(np.uint8)
+        self.overlay = np.where(grid > 1, grid, 0).astype(np.uint8)
+        self.invalidate()
+
+    @property
+    def maze(self):
+        """
+        Compatibility accessor for code indexing the maze as `maze.maze[x][y]`, cells written through it go to set_wall and the overlay.
+        .............
+        Output:
+            GridView of the maze
+        """
+        return GridView(self)
+
+    @maze.setter
+    def maze(self, maze):
+        """
+        Replaces the grid of the maze.
+        .............
+        Input:
+            maze: Nested lists or array of shape (width, height) with the new cell values
+        """
+        self.grid = maze
+
+    def snapshot(self):
+        """
+        Returns a copy of the maze that shares the walls and the caches derived from them, with an overlay holding only the starting and ending points.
+        The shared walls become read-only, the first set_wall on either maze copies them. Labels computed on the snapshot while it
+        still shares the walls are handed back to the maze, so solving one snapshot per click labels the maze only once.
+        .............
+        Output:
+            Maze object
+        """
+        self.walls.flags.writeable = False
+        snapshot = copy.copy(self)
+        snapshot.source = weakref.ref(self)
+        snapshot.fields = OrderedDict(self.fields)
+        snapshot.overlay = np.zeros_like(self.overlay)
+        snapshot.overlay[self.starting_point] = 2
+        snapshot.overlay[self.ending_point] = 3
+        return snapshot
+
+    def clear_overlay(self):
+        """
+        Resets the overlay to the starting and ending points with a single fill, the walls are left untouched.
+        """
+        self.overlay.fill(0)
+        self.overlay[self.starting_point] = 2
+        self.overlay[self.ending_point] = 3
+
+    def set_wall(self, position, wall: bool = True):
+        """
+        Adds or removes a wall. Walls shared with a snapshot are copied before the first change.
+        .............
+        Input:
+            position: Cell position
+            wall: True to add a wall, False to remove it
+        """
+        if self.walls[position] == wall:
+            return
+        if not self.walls.flags.writeable:
+            self.walls = self.walls.copy()
+        self.walls[position] = wall
+        if wall:
+            self.overlay[position] = 0
+        self.invalidate()
+
+    @staticmethod
+    def make_rng(seed, rng):
+        """
+        Creates the random generator owned by the maze.
+        .............
+        Input:
+            seed: Seed of the generator, None for a fresh one
+            rng: numpy.random.Generator to use as is, or random.Random to seed a new generator from
+        Output:
+            numpy.random.Generator
+        """
+        if isinstance(rng, np.random.Generator):
+            return rng
+        if isinstance(rng, random.Random):
+            return np.random.default_rng(rng.getrandbits(128))
+        return np.random.default_rng(seed)
+
     def generate_maze(self):
         """
-        Generates a maze based on the specified coverage.
+        Generates a maze based on the specified coverage with a single draw from the random generator.
+        When a generator is set the maze is a perfect maze built by it instead, every open cell is then reachable from every other one.
         .............
         Output:
             Generated maze
         """
-        maze = [[0 for _ in range(self.height)] for _ in range(self.width)]
-        for i in range(self.width):
-            for j in range(self.height):
-                if random.random() > self.coverage:
-                    maze[i][j] = 1
+        if self.generator is not None:
+            return braid(GENERATORS[self.generator](self.width, self.height, self.rng), self.rng, self.braid)
 
-        return maze
+        draw = self.rng.random((self.width, self.height), dtype=np.float32)
+        return (draw > self.coverage).view(np.uint8)
     
-    def set_point(self, value):
+    def label_components(self):
+        """
+        Labels the connected components of the passable cells with a vectorized union-find pass.
+        Runs of passable cells along a column start as one tree, then every round hooks the roots joined by a horizontal edge
+        onto the smaller root and compresses the hooked trees by pointer jumping. Only the first edge of every run of horizontal
+        edges is kept, and the trees and labels live in two int32 buffers updated in place, so the pass needs under 20 bytes per cell.
+        .............
+        Output:
+            Array of shape (width, height) with 0 for walls and the component number, starting at 1, for passable cells
+        """
+        passable = (self.walls != 1).ravel()
+        height = self.height
+        index_type = np.int32 if passable.size < 2**31 else np.int64
+
+        # every passable cell points to the first cell of its run along the column, walls point to themselves
+        starts = np.ones(passable.size, dtype=bool)
+        np.logical_and(passable[1:], passable[:-1], out=starts[1:])
+        np.logical_not(starts[1:], out=starts[1:])
+        starts[::height] = True
+        parent = np.arange(passable.size, dtype=index_type)
+        parent *= starts
+        np.maximum.accumulate(parent, out=parent)
+        starts &= passable
+        heads = np.flatnonzero(starts).astype(index_type)
+        del starts
+
+        # cells joined to the next column, the edges following another edge join the same two runs
+        edges = passable[:-height] & passable[height:]
+        del passable
+        tops = edges[::height].copy()
+        edges[1:] &= ~edges[:-1]
+        edges[::height] = tops
+        first = np.flatnonzero(edges).astype(index_type)
+        del edges
+
+        first, second = parent[first], parent[first + height]
+        while first.size:
+            first_root = parent[first]
+            second_root = parent[second]
+            joined = first_root != second_root
+            first, second = first[joined], second[joined]
+            hooked = np.maximum(first_root[joined], second_root[joined])
+            parent[hooked] = np.minimum(first_root[joined], second_root[joined])
+
+            roots = parent[hooked]
+            grand_parent = parent[roots]
+            while not np.array_equal(grand_parent, roots):
+                parent[hooked] = grand_parent
+                roots = grand_parent
+                grand_parent = parent[roots]
+            parent[heads] = parent[parent[heads]]
+
+        roots = parent[heads]
+        grand_parent = parent[roots]
+        while not np.array_equal(grand_parent, roots):
+            parent[heads] = grand_parent
+            roots = grand_parent
+            grand_parent = parent[roots]
+
+        labels = parent[parent]
+        roots = heads[roots == heads]
+        parent.fill(0)
+        parent[roots] = np.arange(1, roots.size + 1, dtype=index_type)
+        np.take(parent, labels, out=labels, mode="clip")
+        return labels.reshape(self.walls.shape)
+
+    def components(self):
+        """
+        Returns the component labels of the maze, they are computed on the first call and cached until the walls change.
+        .............
+        Output:
+            Array of shape (width, height) as returned by label_components
+        """
+        if self.labels is None:
+            self.labels = self.label_components()
+            source = self.source and self.source()
+            if source is not None and source.walls is self.walls and source.labels is None:
+                source.labels = self.labels
+        return self.labels
+
+    def is_reachable(self, source, target, compute: bool = True):
+        """
+        Checks whether a path between two cells exists.
+        Without compute only labels that are already cached are used, so the check never reads the whole grid, which the
+        searches rely on for memory-mapped and tiled mazes.
+        .............
+        Input:
+            source: First cell position
+            target: Second cell position
+            compute: Label the components when they are not cached yet
+        Output:
+            True if both cells are passable and lie in the same connected component, or if both are passable and the labels
+            are not cached and not computed
+        """
+        if self.labels is None and not compute:
+            return self.walls[source] != 1 and self.walls[target] != 1
+        labels = self.components()
+        return labels[source] != 0 and labels[source] == labels[target]
+
+    def component_mask(self, position):
+        """
+        Returns the cells of the connected component of a cell, e.g. to restrict a search to it.
+        .............
+        Input:
+            position: Cell position
+        Output:
+            Boolean array of shape (width, height), all False when the cell is a wall
         """
-        Sets a point in the maze based on a given value.
+        labels = self.components()
+        return (labels == labels[position]) & (labels != 0)
+
+    def distance_field(self, source=None):
+        """
+        Returns the distance and predecessor field of a source cell, it is computed on the first call and cached until the walls change.
+        Every field holds 8 bytes per cell, so only the MAX_FIELDS most recently used fields are kept.
+        .............
+        Input:
+            source: Cell position the distances are measured from, defaults to the starting point
+        Output:
+            Tuple of the distances and parents arrays of shape (width, height) as returned by Wavefront.wavefront
+        """
+        source = self.starting_point if source is None else tuple(source)
+        if source in self.fields:
+            self.fields.move_to_end(source)
+        else:
+            distances, parents, _ = wavefront(self.walls, source)
+            self.fields[source] = (distances, parents)
+            while len(self.fields) > self.MAX_FIELDS:
+                self.fields.popitem(last=False)
+        return self.fields[source]
+
+    def path_to(self, target, source=None):
+        """
+        Returns a shortest path from a source cell to a target cell by following the predecessors of the cached field of the source.
+        Repeated queries from the same source only cost the length of the path.
+        .............
+        Input:
+            target: Cell position the path leads to
+            source: Cell position the path starts from, defaults to the starting point
+        Output:
+            List of the cells of the path after the source up to the target, None if the target cannot be reached
+        """
+        target = tuple(target)
+        distances, parents = self.distance_field(source)
+        if distances[target] == -1:
+            return None
+
+        path = []
+        index = target[0] * self.height + target[1]
+        parents = memoryview(parents.reshape(-1))
+        while parents[index] != -1:
+            path.append(divmod(index, self.height))
+            index = parents[index]
+
+        path.reverse()
+        return path
+
+    def path_from(self, source, target=None):
+        """
+        Returns a shortest path from a cell to a target cell by following the predecessors of the cached field of the target.
+        Repeated queries towards the same target only cost the length of the path.
+        .............
+        Input:
+            source: Cell position the path starts from
+            target: Cell position the path leads to, defaults to the ending point
+        Output:
+            List of the cells of the path after the source up to the target, None if the target cannot be reached
+        """
+        target = self.ending_point if target is None else tuple(target)
+        source = tuple(source)
+        distances, parents = self.distance_field(target)
+        if distances[source] == -1:
+            return None
+
+        path = []
+        index = source[0] * self.height + source[1]
+        parents = memoryview(parents.reshape(-1))
+        while parents[index] != -1:
+            index = parents[index]
+            path.append(divmod(index, self.height))
+
+        return path
+
+    def invalidate(self):
+        """
+        Drops the caches derived from the walls of the maze.
+        Has to be called after writing into the walls array directly instead of through set_wall.
+        """
+        self.labels = None
+        self.fields = OrderedDict()
+        self.source = None
+
+    def set_point(self, value, cells):
+        """
+        Sets a point in the maze based on a given value on a random cell of the candidates.
         .............
         Input:
             value: Value to set in the maze
+            cells: Flat indices (x * height + y) of the candidate cells
         Output:
             Point position
         """
-        if value == 2:
-            random.seed(int(time.time()))
-    
-        x, y = random.randint(0, self.width-1), random.randint(0, self.height-1)
+        if len(cells) == 0:
+            raise ValueError("the maze has no open cell left to place the point on")
 
-        while(self.maze[x][y] == 0):
-            x, y = random.randint(0, self.width-1), random.randint(0, self.height-1)
-        else:
-            self.maze[x][y] = value
-            point = (x, y)
+        point = divmod(int(cells[self.rng.integers(len(cells))]), self.height)
+        self.overlay[point] = value
         
         return point
     
     def set_starting_point(self):
         """
-        Sets the starting point in the maze.
+        Sets the starting point on a random open cell of the maze.
+        When connected is set, only cells whose component has another open cell are candidates.
         .............
         Output:
             Starting point position
         """
-        return self.set_point(2)
+        cells = np.flatnonzero(self.grid == 0)
+        if self.connected:
+            labels = self.components().ravel()[cells]
+            cells = cells[np.bincount(labels)[labels] >= 2]
+
+        return self.set_point(2, cells)
 
     def set_ending_point(self):
         """
-        Sets the ending point in the maze.
+        Sets the ending point on a random open cell of the maze other than the starting point.
+        When connected is set, only cells of the component of the starting point are candidates.
         .............
         Output:
             Ending point position
         """
-        return self.set_point(3)
+        cells = np.flatnonzero(self.grid == 0)
+        if self.connected:
+            labels = self.components()
+            cells = cells[labels.ravel()[cells] == labels[self.starting_point]]
+
+        return self.set_point(3, cells)
     
     def update_maze(self, postion):
         """
@@ -96,14 +577,17 @@ class Maze:
         x = postion[0]
         y = postion[1]
 
+        if self.walls[x, y] == 1:
+            self.set_wall((x, y), False)
+
         if postion == self.starting_point:
-            self.maze[x][y] = 2
+            self.overlay[x, y] = 2
         
         elif postion == self.ending_point:
-            self.maze[x][y] = 3
+            self.overlay[x, y] = 3
 
         else:
-            self.maze[x][y] = 5
+            self.overlay[x, y] = 5
             
         
 
@@ -116,8 +600,8 @@ class Maze:
         """
         try:
             for x, y in path:
-                self.maze[x][y] = 4
-            self.maze[self.starting_point[0]][self.starting_point[1]] = 2
-            self.maze[self.ending_point[0]][self.ending_point[1]] = 3
+                self.overlay[x, y] = 4
+            self.overlay[self.starting_point] = 2
+            self.overlay[self.ending_point] = 3
         except:
             return None
@@ -0,0 +1,265 @@
+from Maze import Maze
+from PIL import Image
+from contextlib import contextmanager
+import os
+import struct
+import numpy as np
+
+
+MAGIC = b"MAZE"
+VERSION = 1
+PACKED = 1
+
+# magic, version, flags, width, height, starting point, ending point, seed (-1 for none) and coverage
+HEADER = struct.Struct("<4sHHQQqqqqqd")
+OFFSET = 128
+
+TEXT = {0: ".", 1: "#", 2: "S", 3: "E"}
+
+PNG_COLORS = {
+    0: (255, 255, 255),
+    1: (0, 0, 0),
+    2: (0, 255, 0),
+    3: (255, 0, 0),
+}
+
+
+@contextmanager
+def replacing(path: str):
+    """
+    Opens a temporary file next to a path for writing and moves it over the path once it is written. The walls of a
+    maze opened from the path are memory-mapped from it, so writing the path in place would truncate them before they
+    are read
+    INPUT:
+        path: str
+            the file to write
+    OUTPUT:
+        file: file
+            the temporary file, open for binary writing
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            yield file
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def write_maze(maze: Maze, path: str, packed: bool = False):
+    """
+    Writes the walls and the metadata of a maze to a binary maze file. The file is a fixed size header followed by the
+    walls, one byte per cell or one bit per cell when packed, in the (width, height) order of Maze.walls
+    INPUT:
+        maze: Maze
+            the maze to write, the overlay apart from the starting and ending points is not saved
+        path: str
+            the file to write
+        packed: bool
+            store 8 cells per byte, the file is 8 times smaller but has to be unpacked when it is read
+    OUTPUT:
+        ....
+    """
+    seed = -1 if maze.seed is None else maze.seed
+    header = HEADER.pack(MAGIC, VERSION, PACKED if packed else 0, maze.width, maze.height, *maze.starting_point,
+                         *maze.ending_point, seed, maze.coverage)
+    with replacing(path) as file:
+        file.write(header.ljust(OFFSET, b"\0"))
+        if packed:
+            np.packbits(maze.walls.reshape(-1)).tofile(file)
+        else:
+            np.ascontiguousarray(maze.walls, dtype=np.uint8).tofile(file)
+
+
+def read_header(path: str):
+    """
+    Reads and checks the header of a binary maze file
+    INPUT:
+        path: str
+            the file to read
+    OUTPUT:
+        header: dict
+            the fields of the header
+    """
+    with open(path, "rb") as file:
+        data = file.read(OFFSET)
+    if len(data) < OFFSET or data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a maze file")
+
+    magic, version, flags, width, height, *points, seed, coverage = HEADER.unpack_from(data)
+    if version > VERSION:
+        raise ValueError(f"{path} has version {version}, only versions up to {VERSION} can be read")
+
+    return {
+        "version": version,
+        "packed": bool(flags & PACKED),
+        "width": width,
+        "height": height,
+        "starting_point": tuple(points[:2]),
+        "ending_point": tuple(points[2:]),
+        "seed": None if seed < 0 else seed,
+        "coverage": coverage,
+    }
+
+
+def read_maze(path: str):
+    """
+    Opens a binary maze file. Byte grids are memory-mapped copy-on-write, so only the cells a solver touches are read
+    from disk and changing a wall never changes the file. Packed grids are unpacked into memory.
+    INPUT:
+        path: str
+            the file to read
+    OUTPUT:
+        maze: Maze
+    """
+    header = read_header(path)
+    shape = (header["width"], header["height"])
+    cells = shape[0] * shape[1]
+    expected = OFFSET + ((cells + 7) // 8 if header["packed"] else cells)
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path} is truncated")
+
+    if header["packed"]:
+        data = np.fromfile(path, dtype=np.uint8, count=(cells + 7) // 8, offset=OFFSET)
+        walls = np.unpackbits(data, count=cells).reshape(shape)
+    else:
+        walls = np.memmap(path, dtype=np.uint8, mode="c", offset=OFFSET, shape=shape)
+
+    return Maze.from_walls(walls, header["starting_point"], header["ending_point"], header["seed"], header["coverage"])
+
+
+def write_text(maze: Maze, path: str):
+    """
+    Writes a maze as text, one line per row with '#' for walls, '.' for open cells, 'S' for the starting point and
+    'E' for the ending point
+    INPUT:
+        maze: Maze
+            the maze to write
+        path: str
+            the file to write
+    OUTPUT:
+        ....
+    """
+    cells = np.full(maze.walls.shape, ord(TEXT[0]), dtype=np.uint8)
+    cells[maze.walls == 1] = ord(TEXT[1])
+    cells[maze.starting_point] = ord(TEXT[2])
+    cells[maze.ending_point] = ord(TEXT[3])
+    with open(path, "w", newline="\n") as file:
+        for row in cells.T:
+            file.write(row.tobytes().decode("ascii") + "\n")
+
+
+def read_text(path: str, seed: int = None):
+    """
+    Reads a maze written by write_text, spaces are read as open cells as well
+    INPUT:
+        path: str
+            the file to read
+        seed: int
+            seed of the random generator placing the starting and ending points when the file has none
+    OUTPUT:
+        maze: Maze
+    """
+    with open(path) as file:
+        lines = [line.rstrip("\r\n") for line in file]
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines:
+        raise ValueError(f"{path} holds no maze")
+
+    width = max(len(line) for line in lines)
+    rows = np.frombuffer("".join(line.ljust(width) for line in lines).encode("ascii"), dtype=np.uint8)
+    rows = rows.reshape(len(lines), width)
+
+    grid = np.zeros(rows.shape, dtype=np.uint8)
+    for value, character in TEXT.items():
+        grid[rows == ord(character)] = value
+    return Maze.from_array(grid.T, seed=seed)
+
+
+def write_png(maze: Maze, path: str, cell_size: int = 1):
+    """
+    Writes a maze as an image, black for walls, white for open cells, green for the starting point and red for the
+    ending point
+    INPUT:
+        maze: Maze
+            the maze to write
+        path: str
+            the file to write
+        cell_size: int
+            the size of one cell in pixels
+    OUTPUT:
+        ....
+    """
+    palette = np.zeros((4, 3), dtype=np.uint8)
+    for value, color in PNG_COLORS.items():
+        palette[value] = color
+
+    cells = maze.walls.copy()
+    cells[maze.starting_point] = 2
+    cells[maze.ending_point] = 3
+    pixels = palette.take(cells.T, axis=0).repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+    Image.fromarray(pixels).save(path)
+
+
+def read_png(path: str, cell_size: int = 1, seed: int = None):
+    """
+    Reads a maze from an image, dark pixels are walls and the other pixels are open cells. A pure green pixel marks the
+    starting point and a pure red pixel the ending point, as written by write_png.
+    INPUT:
+        path: str
+            the file to read
+        cell_size: int
+            the size of one cell in pixels, the pixel in the middle of every cell is read
+        seed: int
+            seed of the random generator placing the starting and ending points when the image has none
+    OUTPUT:
+        maze: Maze
+    """
+    with Image.open(path) as image:
+        pixels = np.asarray(image.convert("RGB"))
+    pixels = pixels[cell_size // 2::cell_size, cell_size // 2::cell_size].astype(np.int16)
+
+    red, green, blue = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    grid = (pixels.sum(axis=2) < 3 * 128).astype(np.uint8)
+    grid[(green > 128) & (red < 128) & (blue < 128)] = 2
+    grid[(red > 128) & (green < 128) & (blue < 128)] = 3
+    return Maze.from_array(grid.T, seed=seed)
+
+
+FORMATS = {
+    ".maze": (read_maze, write_maze),
+    ".txt": (read_text, write_text),
+    ".png": (read_png, write_png),
+}
+
+
+def load(path: str):
+    """
+    Opens a maze file in the format given by its extension, files with an unknown extension are read as binary maze
+    files
+    INPUT:
+        path: str
+            the file to read
+    OUTPUT:
+        maze: Maze
+    """
+    read, _ = FORMATS.get(os.path.splitext(path)[1].lower(), FORMATS[".maze"])
+    return read(path)
+
+
+def save(maze: Maze, path: str):
+    """
+    Saves a maze in the format given by the extension of the path, files with an unknown extension are written as
+    binary maze files
+    INPUT:
+        maze: Maze
+            the maze to save
+        path: str
+            the file to write
+    OUTPUT:
+        ....
+    """
+    _, write = FORMATS.get(os.path.splitext(path)[1].lower(), FORMATS[".maze"])
+    write(maze, path)
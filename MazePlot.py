@@ -1,14 +1,146 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import QTimer
-from Search import DFSearch, BFSearch, GBFSearch, AstarSearch
+from PySide6.QtGui import QPixmap, QPainter
+from PySide6.QtCore import QTimer, QObject, QRunnable, QThreadPool, Signal
+from Search import SEARCHES
 from Maze import Maze
-from PIL import Image, ImageDraw
+from SolveCache import SolveCache
+from PIL import Image, ImageColor
 from PIL.ImageQt import ImageQt
-import copy
+import numpy as np
+import math
 
 
-def draw_maze(maze: Maze, image_size: tuple[int]):
+COLORS = {
+    0: "#8FA1A6",
+    1: "#261420",
+    2: "#33FF99",
+    3: "#FC630A",
+    4: "#E6DB15",
+    5: "#6AAED9",
+}
+
+PALETTE = np.full((256, 3), 255, dtype=np.uint8)
+for value, color in COLORS.items():
+    PALETTE[value] = ImageColor.getrgb(color)
+
+HEATMAP = PALETTE.copy()
+HEATMAP[6:] = np.linspace(ImageColor.getrgb(COLORS[2]), ImageColor.getrgb(COLORS[3]), 250).round()
+
+
+def render_grid(grid: np.ndarray, cell_size: int, palette: np.ndarray = PALETTE, outline: np.ndarray = None):
+    """
+    Renders the cells of a maze grid into an RGB pixel array without per-cell drawing calls
+    INPUT:
+        grid: np.ndarray
+            cell states of the maze with shape (width, height)
+        cell_size: int
+            the size of one cell in pixels
+        palette: np.ndarray
+            uint8 array of shape (256, 3) with the color of every cell state
+        outline: np.ndarray
+            optional array of shape (width, height) whose changes are outlined, defaults to the grid
+    OUTPUT:
+        pixels: np.ndarray
+            uint8 array of shape (height * cell_size + 1, width * cell_size + 1, 3), cells are
+            filled with their palette color and outlined in black where neighbouring states differ
+    """
+    cells = np.ascontiguousarray(grid.T)
+    rows, columns = cells.shape
+
+    pixels = np.empty((rows * cell_size + 1, columns * cell_size + 1, 3), dtype=np.uint8)
+    blocks = pixels[:-1, :-1].reshape(rows, cell_size, columns, cell_size, 3)
+    blocks[...] = palette.take(cells, axis=0)[:, None, :, None]
+    pixels[-1, :-1] = pixels[-2, :-1]
+    pixels[:, -1] = pixels[:, -2]
+
+    if outline is not None:
+        cells = np.ascontiguousarray(outline.T)
+    black = np.zeros((rows * cell_size + 1, columns * cell_size + 1), dtype=bool)
+
+    edges = np.ones((rows + 1, columns), dtype=bool)
+    np.not_equal(cells[1:], cells[:-1], out=edges[1:-1])
+    lines = black[::cell_size]
+    lines[:, :-1].reshape(rows + 1, columns, cell_size)[...] = edges[:, :, None]
+    lines[:, cell_size::cell_size] |= edges
+
+    edges = np.ones((rows, columns + 1), dtype=bool)
+    np.not_equal(cells[:, 1:], cells[:, :-1], out=edges[:, 1:-1])
+    lines = black[:, ::cell_size]
+    lines[:-1] |= np.repeat(edges, cell_size, axis=0)
+    lines[cell_size::cell_size] |= edges
+
+    np.multiply(pixels, ~black[..., None], out=pixels)
+
+    return pixels
+
+
+def render_cell(maze: Maze, cell_size: int, position: tuple[int]):
+    """
+    Renders the pixels covered by a single cell, including the border lines it shares with its neighbours. Only the
+    walls and the overlay of the cell and its neighbours are combined, so the cost does not depend on the maze size
+    INPUT:
+        maze: Maze
+            the maze the cell belongs to
+        cell_size: int
+            the size of one cell in pixels
+        position: tuple[int]
+            the cell to render
+    OUTPUT:
+        left: int
+            the x coordinate of the rendered block in the maze image
+        top: int
+            the y coordinate of the rendered block in the maze image
+        pixels: np.ndarray
+            uint8 array of shape (cell_size + 1, cell_size + 1, 3)
+    """
+    x, y = position
+    x0 = max(x - 1, 0)
+    y0 = max(y - 1, 0)
+    block = (slice(x0, x + 2), slice(y0, y + 2))
+    pixels = render_grid(np.maximum(maze.walls[block], maze.overlay[block]), cell_size)
+
+    left = (x - x0) * cell_size
+    top = (y - y0) * cell_size
+    pixels = pixels[top:top + cell_size + 1, left:left + cell_size + 1]
+
+    return x * cell_size, y * cell_size, np.ascontiguousarray(pixels)
+
+
+def get_cell_size(maze: Maze, image_size: tuple[int]):
+    """
+    Computes the size of a cell so the whole maze fits in the pixel map
+    INPUT:
+        maze: Maze
+            Maze object that will be displayed
+        image_size: tuple[int]
+            conisists of the hight and width of the pixel map (width , hight)
+    OUTPUT:
+        cell_size: int
+            the size of one cell in pixels
+    """
+    width, height = image_size
+    return max(min(width // maze.height, height // maze.width), 1)
+
+
+def heatmap_cells(grid: np.ndarray, distances: np.ndarray):
+    """
+    Maps a distance map onto the HEATMAP palette
+    INPUT:
+        grid: np.ndarray
+            cell states of the maze with shape (width, height)
+        distances: np.ndarray
+            distance map of the same shape, -1 for unreached cells
+    OUTPUT:
+        cells: np.ndarray
+            uint8 array with the walls kept, unreached cells open and reached cells
+            shaded from the start color to the end color by their distance
+    """
+    cells = (grid == 1).view(np.uint8)
+    shades = distances.astype(np.int64) * 249 // max(int(distances.max()), 1) + 6
+    return np.where(distances >= 0, shades, cells).astype(np.uint8)
+
+
+def draw_maze(maze: Maze, image_size: tuple[int], distances: np.ndarray = None):
     """
     Generates a pixrl map for display
     INPUT:
@@ -16,71 +148,106 @@ def draw_maze(maze: Maze, image_size: tuple[int]):
             Maze object that will be displayed
         image_size: tuple[int]
             conisists of the hight and width of the pixel map (width , hight)
+        distances: np.ndarray
+            optional distance map, when given it is drawn as a heatmap instead of the cell states
     OUTPUT:
         img: Image
             the pixel map
     """
     width, height = image_size
-    cell_size = min(width // maze.height, height // maze.width)
+    cell_size = get_cell_size(maze, image_size)
 
     img = Image.new("RGB", (height, width), "white")
-    draw = ImageDraw.Draw(img)
-
-    for i in range(maze.width):
-        for j in range(maze.height):
-            x0 = i * cell_size
-            y0 = j * cell_size
-            x1 = x0 + cell_size
-            y1 = y0 + cell_size
-        
-            if maze.maze[i][j] == 1:
-                draw.rectangle([x0, y0, x1, y1], fill="#261420")
-            if maze.maze[i][j] == 2:
-                draw.rectangle([x0, y0, x1, y1], fill="#33FF99")
-            if maze.maze[i][j] == 3:
-                draw.rectangle([x0, y0, x1, y1], fill="#FC630A")
-            if maze.maze[i][j] == 4:
-                draw.rectangle([x0, y0, x1, y1], fill="#E6DB15")
-            if maze.maze[i][j] == 5:
-                draw.rectangle([x0, y0, x1, y1], fill="#6AAED9")
-            if maze.maze[i][j] == 0:
-                draw.rectangle([x0, y0, x1, y1], fill="#8FA1A6")
-
-    for i in range(maze.width):
-        for j in range(maze.height):
-            x0 = i * cell_size
-            y0 = j * cell_size
-            x1 = x0 + cell_size
-            y1 = y0 + cell_size
-
-            if j == 0 or maze.maze[i][j-1] != maze.maze[i][j]:
-                draw.line((x0,y0,x1,y0), fill="black")
-
-            if j == maze.height-1 or maze.maze[i][j+1] != maze.maze[i][j]:
-                draw.line((x0,y1,x1,y1), fill="black")
-
-            if i == 0 or maze.maze[i-1][j] != maze.maze[i][j]:
-                draw.line((x0,y0,x0,y1), fill="black")
-
-            if i == maze.width-1 or maze.maze[i+1][j] != maze.maze[i][j]:
-                draw.line((x1,y0,x1,y1), fill="black")
+    if distances is None:
+        pixels = render_grid(maze.grid, cell_size)
+    else:
+        pixels = render_grid(heatmap_cells(maze.grid, distances), cell_size, HEATMAP, maze.grid == 1)
+    img.paste(Image.fromarray(pixels[:width, :height]))
 
     return img
 
+
+class TaskSignals(QObject):
+    """
+    Signals of a Task, a QRunnable is not a QObject and cannot emit signals itself
+    Attributes:
+        finished: Signal
+            emitted with the result of the function, slots of widgets run on the GUI thread
+    """
+    finished = Signal(object)
+
+
+class Task(QRunnable):
+    """
+    Runs a function on a thread of the global QThreadPool so the GUI keeps responding
+    Attributes:
+        function: callable
+        arguments: tuple
+        signals: TaskSignals
+    Methods:
+        run():
+    """
+    def __init__(self, function, *arguments):
+        """
+        initializes the task, it is started with QThreadPool.globalInstance().start(task)
+        INPUT:
+            function: callable
+                the function to run in the background
+            arguments: tuple
+                the arguments of the function
+        OUTPUT:
+            ....
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.function = function
+        self.arguments = arguments
+        self.signals = TaskSignals()
+
+    def run(self):
+        """
+        calls the function on the worker thread and emits its result
+        INPUT:
+            ....
+        OUTPUT:
+            ....
+        """
+        self.signals.finished.emit(self.function(*self.arguments))
+
+
 class MazeWidget(QWidget):
     """
     Object to render and control the maze image
     Attributes:
         dimenions: tuble
         maze: Maze
-        unsearched_maze: Maze
+        cache: SolveCache
+            optional cache of search results shared between widgets
+        search: Search
+            the search running in the background, None when no search is running
+        visited: list
+            flat indices of the expanded cells of a finished search
+        cursor: int
+            number of expanded cells already animated
+        fps: int
+            frames painted per second while the search is replayed
+        duration: float
+            seconds the replay of a search takes, whatever the size of the maze
+        timer: QTimer
+            the frame timer of the widget, it only runs while there is something to paint
         label: Qlabel
+        pixmap: QPixmap
+            backing image of the label, only the cells that change are repainted on it
     Methods:
         get_path(method='reg'):
+        cancel():
+        solved(result: tuple):
         draw_maze():
+        repaint_maze():
+        paint_cells(positions: list):
         update_maze():
     """
-    def __init__(self, maze: Maze, dimensions: tuple):
+    def __init__(self, maze: Maze, dimensions: tuple, cache: SolveCache = None, fps: int = 60, duration: float = 5.0):
         """
         the function initilizes the MazeWidget object and controls the apearnce of the maze through class methods
         INPUT:
@@ -88,13 +255,26 @@ class MazeWidget(QWidget):
                 Maze object which will be displayed
             dimensions: tuple
                 contains the image dimentions to be displayed
+            cache: SolveCache
+                cache to look search results up in before solving, None to always solve
+            fps: int
+                frames painted per second while the search is replayed
+            duration: float
+                seconds the replay of a search takes
         OUTPUT:
             ...
         """
         super().__init__()
         self.dimensions = dimensions
         self.maze = maze
-        self.unsearched_maze = copy.deepcopy(self.maze)
+        self.cache = cache
+        self.fps = fps
+        self.duration = duration
+        self.search = None
+        self.task = None
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_maze)
         self.get_path()
 
         self.label = QLabel()
@@ -107,25 +287,72 @@ class MazeWidget(QWidget):
         self.draw_maze()
 
     def get_path(self, method="reg"):
+        """
+        starts solving the maze with the given algorithm on a worker thread, a search still running is cancelled.
+        The animation follows the expanded cells while the search runs, cached results are shown at once.
+        INPUT:
+            method: str
+                key of SEARCHES, 'reg' for no search
+        OUTPUT:
+            ....
+        """
+        self.cancel()
+        self.solution = []
+        self.visited = []
+        self.cursor = 0
+        self.path_displayed = False
+
         if method == "reg":
-            self.solution = []
-            self.steps = []
-        elif method == "DFS":
-            self.search = DFSearch(self.maze)
-            self.solution, self.steps = self.search.search_solve()
-        elif method =="BFS":
-            self.search = BFSearch(self.maze)
-            self.solution, self.steps = self.search.search_solve()
-        elif method == "GBFS":
-            self.search = GBFSearch(self.maze)
-            self.solution, self.steps = self.search.search_solve()
-        elif method == "A*":
-            self.search = AstarSearch(self.maze)
-            self.solution, self.steps = self.search.search_solve()
-
-        
-        if self.solution == None:
-            self.solution = []
+            return
+
+        if self.cache is not None:
+            result = self.cache.get(self.maze, method)
+            if result is not None:
+                self.solution = result[0] or []
+                self.visited = [x * self.maze.height + y for x, y in result[1]]
+                self.timer.start(round(1000 / self.fps))
+                return
+
+        snapshot = self.maze.snapshot()
+        self.method = method
+        self.search = SEARCHES[method](snapshot)
+        self.task = Task(self.search.search_solve)
+        self.task.signals.finished.connect(self.solved)
+        QThreadPool.globalInstance().start(self.task)
+        self.timer.start(round(1000 / self.fps))
+
+    def cancel(self):
+        """
+        stops the search running in the background, its result is dropped
+        INPUT:
+            ....
+        OUTPUT:
+            ....
+        """
+        if self.search is not None:
+            self.search.cancel()
+        self.search = None
+        self.task = None
+
+    def solved(self, result: tuple):
+        """
+        takes the result of the background search on the GUI thread
+        INPUT:
+            result: tuple
+                the solution path and the visited states returned by search_solve
+        OUTPUT:
+            ....
+        """
+        if self.task is None or self.sender() is not self.task.signals:
+            return
+
+        solution, steps = result
+        if self.cache is not None:
+            self.cache.put(self.search.maze, self.method, solution, steps)
+        self.solution = solution or []
+        self.visited = self.search.visited
+        self.search = None
+        self.task = None
 
     def draw_maze(self):
         """
@@ -135,33 +362,64 @@ class MazeWidget(QWidget):
         OUTPUT:
             ....
         """
+        self.repaint_maze()
+        self.timer.start(round(1000 / self.fps))
+
+    def repaint_maze(self):
+        """
+        renders the whole maze into the backing image of the widget
+        INPUT:
+            ....
+        OUTPUT:
+            ....
+        """
+        self.cell_size = get_cell_size(self.maze, self.dimensions)
         img = draw_maze(self.maze, image_size=self.dimensions)
 
         qimg = ImageQt(img)
-        pixmap = QPixmap.fromImage(qimg)
-        self.label.setPixmap(pixmap)
+        self.pixmap = QPixmap.fromImage(qimg)
+        self.label.setPixmap(self.pixmap)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_maze)
-        self.timer.start(0)
+    def paint_cells(self, positions: list):
+        """
+        repaints the given cells and their border lines on the backing image as one batch
+        INPUT:
+            positions: list
+                the cells whose state changed
+        OUTPUT:
+            ....
+        """
+        painter = QPainter(self.pixmap)
+        for position in positions:
+            left, top, pixels = render_cell(self.maze, self.cell_size, position)
+            painter.drawImage(left, top, ImageQt(Image.fromarray(pixels)))
+        painter.end()
+
+        self.label.setPixmap(self.pixmap)
 
     def update_maze(self):
         """
-        Updates the maze image in the widget
+        Paints one frame of the replay, the number of steps per frame is chosen so the whole replay takes about
+        duration seconds. Only the cells changed by the steps are repainted and the timer stops once the path is shown.
         INPUT:
             ....
         OUTPUT:
             ....
         """
-        try:
-            position = self.steps.pop(0)
-            self.maze.update_maze(position)
-        except IndexError:
-            self.maze.display_path(self.solution)
+        visited = self.visited if self.search is None else self.search.visited or ()
+        if self.cursor >= len(visited):
+            if self.search is None:
+                if not self.path_displayed:
+                    self.maze.display_path(self.solution)
+                    self.paint_cells(self.solution + [self.maze.starting_point, self.maze.ending_point])
+                    self.path_displayed = True
+                self.timer.stop()
+            return
 
-
-        img = draw_maze(self.maze, image_size=self.dimensions)
-
-        qimg = ImageQt(img)
-        pixmap = QPixmap.fromImage(qimg)
-        self.label.setPixmap(pixmap)
\ No newline at end of file
+        steps = max(math.ceil(len(visited) / (self.fps * self.duration)), 1)
+        height = self.maze.height
+        positions = [divmod(index, height) for index in visited[self.cursor:self.cursor + steps]]
+        self.cursor += len(positions)
+        for position in positions:
+            self.maze.update_maze(position)
+        self.paint_cells(positions)
@@ -1,9 +1,19 @@
 from Maze import Maze
+from Wavefront import wavefront, descend
+from Clusters import ClusterGraph
+from array import array
+from collections import deque
+import heapq
+import itertools
+import weakref
+import numpy as np
 
 class Node:
     """
-    This class represents a node in a search tree.
+    This class represents a node in a search tree. The search itself keeps its tree in flat parent and cost arrays, the class is kept for code building search trees of its own.
     """
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent):
         """
         Initializes a new Node object with the given state and parent.
@@ -19,23 +29,112 @@ class Node:
             self.action = 0
 
 
+def index_typecode(size):
+    """
+    Returns the array typecode able to hold every flat cell index of a maze.
+
+    :param size: The number of cells of the maze.
+    :return: 'i' (int32) when the indices fit in 32 bits, 'q' (int64) otherwise.
+    """
+    return "i" if size < 2**31 else "q"
+
+
+PAGE_SIZE = 256
+
+
+class PagedArray:
+    """
+    This class stands in for a per-cell array on mazes too large to hold one entry per cell. The cells are split into square pages like the chunks of a TiledMaze, and a page is only allocated when one of its cells is set, so memory grows with the region a search reaches instead of the size of the maze.
+    """
+    def __init__(self, height, page_size, typecode=None, value=0):
+        """
+        Initializes a new PagedArray object without any page.
+
+        :param height: The height of the maze.
+        :param page_size: The side of a page in cells.
+        :param typecode: The array typecode of the values, None for a bytearray.
+        :param value: The value of the cells of pages that were never set.
+        """
+        self.height = height
+        self.page_size = page_size
+        self.rows = -(-height // page_size)
+        self.value = value
+        self.blank = cell_array(page_size, page_size, typecode, value)
+        self.pages = {}
+
+    def __getitem__(self, index):
+        """
+        Returns the value of a cell.
+
+        :param index: The flat index of the cell.
+        :return: The value of the cell, the initial value if its page was never set.
+        """
+        x, y = divmod(index, self.height)
+        size = self.page_size
+        page = self.pages.get(x // size * self.rows + y // size)
+        if page is None:
+            return self.value
+        return page[x % size * size + y % size]
+
+    def __setitem__(self, index, value):
+        """
+        Sets the value of a cell, allocating its page on the first write.
+
+        :param index: The flat index of the cell.
+        :param value: The new value of the cell.
+        """
+        x, y = divmod(index, self.height)
+        size = self.page_size
+        key = x // size * self.rows + y // size
+        page = self.pages.get(key)
+        if page is None:
+            page = self.pages[key] = self.blank[:]
+        page[x % size * size + y % size] = value
+
+
+def cell_array(width, height, typecode=None, value=0, page_size=None):
+    """
+    Returns an array holding one value per cell of a maze.
+
+    :param width: The width of the maze.
+    :param height: The height of the maze.
+    :param typecode: The array typecode of the values, None for a bytearray.
+    :param value: The initial value of every cell.
+    :param page_size: Return a PagedArray with pages of this side, for tiled and memory-mapped mazes.
+    :return: A bytearray, an array or a PagedArray.
+    """
+    if page_size is not None:
+        return PagedArray(height, page_size, typecode, value)
+    if typecode is None:
+        return bytearray([value]) * (width * height)
+    return array(typecode, [value]) * (width * height)
+
+
 class StackFrontier:
     """
-    This class represents a stack-based frontier for use in depth-first search.
+    This class represents a stack-based frontier for use in depth-first search. The frontier holds flat cell indices (x * height + y) and tracks its members in a bitmap with one byte per cell, giving constant time membership tests.
     """
-    def __init__(self):
+    def __init__(self, width, height, page_size=None):
         """
-        Initializes a new StackFrontier object.
+        Initializes a new StackFrontier object for a maze of the given dimensions.
+
+        :param width: The width of the maze.
+        :param height: The height of the maze.
+        :param page_size: Track the members in a PagedArray with pages of this side instead of a bitmap, for tiled mazes.
         """
         self.frontier = []
+        self.height = height
+        self.states = cell_array(width, height, page_size=page_size)
 
-    def add(self, node):
+    def add(self, index, cost):
         """
-        Adds a new node to the frontier.
+        Adds a new cell to the frontier.
         
-        :param node: The node to add to the frontier.
+        :param index: The flat index of the cell to add to the frontier.
+        :param cost: The number of steps from the start to the cell.
         """
-        self.frontier.append(node)
+        self.frontier.append(index)
+        self.states[index] = 1
 
     def is_empty(self):
         """
@@ -48,107 +147,265 @@ class StackFrontier:
 
     def remove(self):
         """
-        Removes and returns the next node from the frontier.
+        Removes and returns the next cell from the frontier.
         
-        :return: The next node from the frontier.
+        :return: The flat index of the next cell from the frontier.
         :raises Exception: If the frontier is empty.
         """
         if self.is_empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier.pop()
-            return node
+            index = self.frontier.pop()
+            self.states[index] = 0
+            return index
     
-    def contains(self, state):
+    def contains(self, index):
         """
-        Returns True if the frontier contains a node with the given state, False otherwise.
+        Returns True if the frontier contains the given cell, False otherwise.
         
-        :param state: The state to check for in the frontier.
-        :return: A boolean indicating whether the frontier contains a node with the given state.
+        :param index: The flat index of the cell to check for in the frontier.
+        :return: A boolean indicating whether the frontier contains the cell.
         """
-        return any(node.state == state for node in self.frontier)
+        return self.states[index] == 1
+
+    def improves(self, index, cost):
+        """
+        Returns True if reaching the given cell, which is already in the frontier, with the given cost should replace the queued entry, False otherwise.
+        
+        :param index: The flat index of the cell already contained in the frontier.
+        :param cost: The cost of the new way of reaching the cell.
+        :return: A boolean indicating whether the cell should be added to the frontier again.
+        """
+        return False
     
 
 class QueueFrontier(StackFrontier):
     """
     This class represents a queue-based frontier for use in breadth-first search. It inherits from StackFrontier and overrides the remove method to implement a queue instead of a stack.
     """
+    def __init__(self, width, height, page_size=None):
+        """
+        Initializes a new QueueFrontier object for a maze of the given dimensions. The cells are kept in a deque so both ends can be accessed in constant time.
+
+        :param width: The width of the maze.
+        :param height: The height of the maze.
+        :param page_size: Track the members in a PagedArray with pages of this side instead of a bitmap, for tiled mazes.
+        """
+        super().__init__(width, height, page_size)
+        self.frontier = deque()
+
     def remove(self):
         """
-        Removes and returns the next node from the frontier. Overrides the remove method from StackFrontier to implement a queue instead of a stack.
+        Removes and returns the next cell from the frontier. Overrides the remove method from StackFrontier to implement a queue instead of a stack.
         
-        :return: The next node from the frontier.
+        :return: The flat index of the next cell from the frontier.
         :raises Exception: If the frontier is empty.
         """
         if self.is_empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier.pop(0)
-            return node
+            index = self.frontier.popleft()
+            self.states[index] = 0
+            return index
         
 class GeedyFrontier(QueueFrontier):
     """
-    This class represents a greedy best-first search frontier. It inherits from QueueFrontier and overrides the add method to implement a priority queue based on distance to the goal.
+    This class represents a greedy best-first search frontier. It inherits from QueueFrontier and overrides the add and remove methods to implement a binary heap priority queue based on distance to the goal. Cells with equal distance are removed in the order they were added.
     """
-    def __init__(self, end_point):
+    def __init__(self, width, height, end_point, page_size=None):
         """
-        Initializes a new GeedyFrontier object with the given end point.
+        Initializes a new GeedyFrontier object with the given maze dimensions and end point.
         
+        :param width: The width of the maze.
+        :param height: The height of the maze.
         :param end_point: The end point of the search.
+        :param page_size: Track the members in a PagedArray with pages of this side instead of a bitmap, for tiled mazes.
         """
-        super().__init__()
+        super().__init__(width, height, page_size)
+        self.frontier = []
+        self.counter = itertools.count()
         self.end_point = end_point
 
-    def add(self, node: Node):
+    def add(self, index, cost):
         """
-       Adds a new node to the frontier based on its distance to the goal. Overrides the add method from QueueFrontier to implement a priority queue based on distance to the goal.
+       Adds a new cell to the frontier based on its distance to the goal. Overrides the add method from QueueFrontier to implement a priority queue based on distance to the goal.
 
-       :param node: The node to add to the frontier.
+       :param index: The flat index of the cell to add to the frontier.
+       :param cost: The number of steps from the start to the cell.
        """
-        for i, fornter_node in enumerate(self.frontier):
-            if self.get_distance(fornter_node) > self.get_distance(node):
-                self.frontier.insert(i, node)
-                return
-            
-        self.frontier.append(node)
+        heapq.heappush(self.frontier, (self.get_distance(index, cost), next(self.counter), index, cost))
+        self.states[index] = 1
+
+    def remove(self):
+        """
+       Removes and returns the cell closest to the goal from the frontier. Overrides the remove method from QueueFrontier.
+
+       :return: The flat index of the next cell from the frontier.
+       :raises Exception: If the frontier is empty.
+       """
+        if self.is_empty():
+            raise Exception("empty frontier")
+        else:
+            index = heapq.heappop(self.frontier)[2]
+            self.states[index] = 0
+            return index
 
-    def get_distance(self, node: Node):
+    def get_distance(self, index, cost):
         """
-       Returns the distance between the given node and the end point.
+       Returns the distance between the given cell and the end point.
 
-       :param node: The node to calculate distance for.
-       :return: The distance between the given node and the end point.
+       :param index: The flat index of the cell to calculate distance for.
+       :param cost: The number of steps from the start to the cell.
+       :return: The distance between the given cell and the end point.
        """
-        return abs(node.state[0] - self.end_point[0]) + abs(node.state[1] - self.end_point[1])
+        x, y = divmod(index, self.height)
+        return abs(x - self.end_point[0]) + abs(y - self.end_point[1])
     
 class AstarFrontier(GeedyFrontier):
     """
-   This class represents an A* search frontier. It inherits from GeedyFrontier and overrides get_distance method to include both distance to goal and cost so far in its calculation of priority.
+   This class represents an A* search frontier. It inherits from GeedyFrontier and overrides get_distance method to include both distance to goal and cost so far in its calculation of priority. A cell already in the frontier can be re-opened with a cheaper cost, the outdated entry is then skipped when it reaches the top of the heap.
    """
-    def get_distance(self, node: Node):
+    def __init__(self, width, height, end_point, page_size=None):
+        """
+      Initializes a new AstarFrontier object with the given maze dimensions and end point.
+
+      :param width: The width of the maze.
+      :param height: The height of the maze.
+      :param end_point: The end point of the search.
+      :param page_size: Track the members in a PagedArray with pages of this side instead of a bitmap, for tiled mazes.
+      """
+        super().__init__(width, height, end_point, page_size)
+        self.costs = {}
+
+    def add(self, index, cost):
         """
-      Returns an estimate of total cost from start through this given node to reach goal. Overrides get_distance method from GeedyFrontier.
+      Adds a new cell to the frontier and records its cost as the cheapest known cost of the cell.
 
-      :param node: The node to calculate total cost for
-      :return: An estimate of total cost from start through this given node to reach goal
+      :param index: The flat index of the cell to add to the frontier.
+      :param cost: The number of steps from the start to the cell.
       """
-        return super().get_distance(node) + node.action
+        self.costs[index] = cost
+        super().add(index, cost)
+
+    def remove(self):
+        """
+      Removes and returns the cell with the lowest estimated total cost from the frontier.
+
+      :return: The flat index of the next cell from the frontier.
+      :raises Exception: If the frontier is empty.
+      """
+        index = super().remove()
+        del self.costs[index]
+        return index
+
+    def is_empty(self):
+        """
+      Returns True if the frontier is empty, False otherwise. Outdated entries at the top of the heap are discarded first.
+
+      :return: A boolean indicating whether the frontier is empty.
+      """
+        while self.frontier and self.frontier[0][3] != self.costs.get(self.frontier[0][2]):
+            heapq.heappop(self.frontier)
+        return super().is_empty()
+
+    def improves(self, index, cost):
+        """
+      Returns True if the given cost is cheaper than the cost of the entry already queued for the cell.
+
+      :param index: The flat index of the cell already contained in the frontier.
+      :param cost: The cost of the new way of reaching the cell.
+      :return: A boolean indicating whether the cell should be added to the frontier again.
+      """
+        return cost < self.costs[index]
+
+    def get_distance(self, index, cost):
+        """
+      Returns an estimate of total cost from start through this given cell to reach goal. Overrides get_distance method from GeedyFrontier.
+
+      :param index: The flat index of the cell to calculate total cost for
+      :param cost: The number of steps from the start to the cell
+      :return: An estimate of total cost from start through this given cell to reach goal
+      """
+        return super().get_distance(index, cost) + cost
 
 
 class Search:
     """
-    This class represents a generic search algorithm for solving mazes.
+    This class represents a generic search algorithm for solving mazes. The search works on flat cell indices (x * height + y) and keeps its search tree in an int32 parent array and an int32 cost array instead of one Node object per cell. The flat indices of the expanded cells are appended to `visited` while the search runs, so another thread can follow the search and stop it with cancel.
+    On a TiledMaze the walls are read chunk by chunk through its cache and the per-cell state is kept in PagedArray pages of the size of its chunks, so memory grows with the region the search reaches instead of the size of the maze. Searches that need the whole grid in memory set TILED to False. Memory-mapped walls are read in place and get the same paged state, so only the pages of the file around the expanded cells are loaded.
     """
+    TILED = True
+
     def __init__(self, maze: Maze):
         """
         Initializes a new Search object with the given maze.
         
         :param maze: The maze to solve.
+        :raises ValueError: If the maze is tiled and the search cannot solve tiled mazes.
         """
         self.maze = maze
+        tiled = not isinstance(maze.walls, np.ndarray)
+        if tiled and not self.TILED:
+            raise ValueError(f"{type(self).__name__} needs the whole grid in memory and cannot solve tiled mazes")
+        self.page_size = None
+        if tiled:
+            self.page_size = maze.walls.chunk_size
+        elif self.TILED and isinstance(maze.walls, np.memmap):
+            self.page_size = PAGE_SIZE
+        self.cells = maze.walls if tiled else memoryview(maze.walls.reshape(-1))
+        self.width = maze.width
+        self.height = maze.height
         self.start_position = self.maze.starting_point
         self.start_node = Node(self.start_position, None)
         self.end_position = self.maze.ending_point
+        self.visited = None
+        self.path = None
+        self.solution = None
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Asks a search running in another thread to stop, it returns no path and the cells expanded so far.
+        """
+        self.cancelled = True
+
+    def reachable(self):
+        """
+        Returns False when the start and end positions are known to lie in different connected components, so the search can be skipped. The components of mazes held in memory are labelled on the first search and cached on the maze, memory-mapped and tiled mazes only use labels that are already cached so the search never reads their whole grid up front.
+
+        :return: A boolean indicating whether a path may exist.
+        """
+        walls = self.maze.walls
+        compute = isinstance(walls, np.ndarray) and not isinstance(walls, np.memmap)
+        return self.maze.is_reachable(self.start_position, self.end_position, compute)
+
+    def cell_array(self, typecode=None, value=0):
+        """
+        Returns an array holding one value per cell of the maze, a PagedArray on tiled and memory-mapped mazes.
+
+        :param typecode: The array typecode of the values, None for a bytearray.
+        :param value: The initial value of every cell.
+        :return: A bytearray, an array or a PagedArray.
+        """
+        return cell_array(self.width, self.height, typecode, value, self.page_size)
+
+    def index(self, state):
+        """
+        Returns the flat index of the given state.
+
+        :param state: The state to convert.
+        :return: The flat index x * height + y of the state.
+        """
+        return state[0] * self.height + state[1]
+
+    def state(self, index):
+        """
+        Returns the state of the given flat index.
+
+        :param index: The flat index to convert.
+        :return: The state (x, y) of the index.
+        """
+        return divmod(index, self.height)
 
     def neighphors(self, state):
         """
@@ -157,62 +414,133 @@ class Search:
         :param state: The state to find neighbors for.
         :return: A list of neighboring states.
         """
-        maze = self.maze
+        return [self.state(index) for index in self.neighbor_indices(self.index(state))]
+
+    def neighbor_indices(self, index):
+        """
+        Returns the flat indices of the neighbors of the given cell in the maze.
+        
+        :param index: The flat index of the cell to find neighbors for.
+        :return: A list of flat indices of the neighboring cells.
+        """
+        cells = self.cells
+        height = self.height
         neighbors = []
-        x, y = state
+        y = index % height
 
-        if x > 0 and maze.maze[x-1][y] != 1:
-            neighbors.append((x-1, y))
-        if x < maze.width-1 and maze.maze[x+1][y] != 1:
-            neighbors.append((x+1, y))
-        if y > 0 and maze.maze[x][y-1] != 1:
-            neighbors.append((x, y-1))
-        if y < maze.height-1 and maze.maze[x][y+1] != 1:
-            neighbors.append((x, y+1))
+        if index >= height and cells[index-height] != 1:
+            neighbors.append(index-height)
+        if index < len(cells)-height and cells[index+height] != 1:
+            neighbors.append(index+height)
+        if y > 0 and cells[index-1] != 1:
+            neighbors.append(index-1)
+        if y < height-1 and cells[index+1] != 1:
+            neighbors.append(index+1)
 
         return neighbors
     
     def search_solve(self):
         """
-       Solves the maze using the search algorithm defined by the frontier.
+       Solves the maze using the search algorithm defined by the frontier. When the start and end positions lie in different connected components the search is skipped, see reachable.
 
        :return: A tuple containing the solution path and the list of visited states.
        """
-        frontier = self.frontier
-        source_node = self.start_node
+        path, visited = self.search_indices()
+        visited = [self.state(index) for index in visited]
+        if path is None:
+            return (None, visited)
+
+        return ([self.state(index) for index in path], visited)
+
+    def iter_solve(self):
+        """
+       Solves the maze lazily, yielding every state as soon as it is expanded. The solution path is the return value of the generator and is also kept in `solution`.
+
+       :return: A generator of the visited states.
+       """
+        height = self.height
+        for index in self.iter_indices():
+            yield divmod(index, height)
+
+        self.solution = None if self.path is None else [self.state(index) for index in self.path]
+        return self.solution
+
+    def search_path(self):
+        """
+       Solves the maze without keeping the visited states.
+
+       :return: The solution path, or None if there is no path.
+       """
+        deque(self.iter_indices(), maxlen=0)
+        return None if self.path is None else [self.state(index) for index in self.path]
+
+    def search_indices(self):
+        """
+       Solves the maze like search_solve but returns flat cell indices in compact arrays, without creating a tuple per state. The expanded cells are appended to `visited` as they come, and the search stops without a path soon after cancel is called.
 
+       :return: A tuple containing the solution path as an array of flat indices, or None if there is no path, and the array of flat indices of the visited cells.
+       """
+        visited = self.visited = array(index_typecode(self.width * self.height))
+        expansions = self.iter_indices()
+        while not self.cancelled:
+            count = len(visited)
+            visited.extend(itertools.islice(expansions, 1024))
+            if len(visited) - count < 1024:
+                return (self.path, visited)
 
-        frontier.add(source_node)
+        return (None, visited)
 
-        visited = []
+    def iter_indices(self):
+        """
+       Runs the search defined by the frontier, yielding the flat index of every cell as it is expanded. The solution path is stored in `path` as an array of flat indices, or None if there is no path, and is also the return value of the generator.
+
+       :return: A generator of the flat indices of the visited cells.
+       """
+        size = self.width * self.height
+        typecode = index_typecode(size)
+        self.path = None
+        if not self.reachable():
+            return None
+
+        frontier = self.frontier
+        parent = self.cell_array(typecode, -1)
+        cost = self.cell_array("i", 0)
+        seen = self.cell_array()
+        goal = self.index(self.end_position)
+        node = self.index(self.start_position)
+
+        frontier.add(node, 0)
 
         while(not frontier.is_empty()):
 
             node = frontier.remove()
-            visited.append(node.state)
-            if node.state == self.end_position:
-                goal = node
+            yield node
+            seen[node] = 1
+            if node == goal:
                 break
 
-            neighbors = self.neighphors(node.state)
-            for neighbor in neighbors:
-                neighbor
-                if neighbor not in visited and not frontier.contains(neighbor):
-                    new_node = Node(neighbor, node)
-                    frontier.add(new_node)
+            step = cost[node] + 1
+            for neighbor in self.neighbor_indices(node):
+                if seen[neighbor]:
+                    continue
+                if not frontier.contains(neighbor) or frontier.improves(neighbor, step):
+                    parent[neighbor] = node
+                    cost[neighbor] = step
+                    frontier.add(neighbor, step)
 
 
         else:
-            return (None, visited)
+            return None
         
-        path = []
-        while goal.parent is not None:
-            path.append(goal.state)
+        path = array(typecode)
+        while parent[node] != -1:
+            path.append(node)
 
-            goal = goal.parent
+            node = parent[node]
 
-
-        return (path[::-1], visited)
+        path.reverse()
+        self.path = path
+        return path
     
 class BFSearch(Search):
     """
@@ -225,7 +553,7 @@ class BFSearch(Search):
       :param maze: The maze to solve.
       """
         super().__init__(maze)
-        self.frontier = QueueFrontier()
+        self.frontier = QueueFrontier(maze.width, maze.height, self.page_size)
 
 class DFSearch(Search):
     """
@@ -238,7 +566,7 @@ class DFSearch(Search):
       :param maze: The maze to solve.
       """
         super().__init__(maze)
-        self.frontier = StackFrontier()
+        self.frontier = StackFrontier(maze.width, maze.height, self.page_size)
 
 class GBFSearch(Search):
     """
@@ -251,7 +579,7 @@ class GBFSearch(Search):
       :param maze: The maze to solve.
       """
         super().__init__(maze)
-        self.frontier = GeedyFrontier(maze.ending_point)
+        self.frontier = GeedyFrontier(maze.width, maze.height, maze.ending_point, self.page_size)
 
 class AstarSearch(Search):
     """
@@ -264,4 +592,615 @@ class AstarSearch(Search):
       :param maze: The maze to solve.
       """
         super().__init__(maze)
-        self.frontier = AstarFrontier(maze.ending_point)
+        self.frontier = AstarFrontier(maze.width, maze.height, maze.ending_point, self.page_size)
+
+
+class JPSearch(Search):
+    """
+   This class represents a jump point search algorithm for solving mazes. It inherits from Search and runs A* over jump points only: from every expanded cell it scans straight lines until a cell with a forced neighbor, the end position or a wall, which prunes the symmetric paths A* would expand on the uniform-cost 4-connected grid. The returned path is expanded back into single steps and the visited states are the expanded jump points.
+   """
+    def is_open(self, x, y):
+        """
+      Returns True if the given position lies inside the maze and is not a wall.
+
+      :param x: The x coordinate.
+      :param y: The y coordinate.
+      :return: A boolean indicating whether the position can be entered.
+      """
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[x * self.height + y] != 1
+
+    def jump_x(self, x, y, dx):
+        """
+      Scans along the x axis from the given position until a jump point is found.
+
+      :param x: The x coordinate of the first cell of the scan.
+      :param y: The y coordinate of the scan.
+      :param dx: The direction of the scan, 1 or -1.
+      :return: The x coordinate of the jump point, or None if a wall or the border is reached first.
+      """
+        end_x, end_y = self.end_position
+        is_open = self.is_open
+        while is_open(x, y):
+            if (x == end_x and y == end_y) or \
+                    (is_open(x, y-1) and not is_open(x-dx, y-1)) or \
+                    (is_open(x, y+1) and not is_open(x-dx, y+1)):
+                return x
+            x += dx
+
+        return None
+
+    def jump_y(self, x, y, dy):
+        """
+      Scans along the y axis from the given position until a jump point is found. A cell from which a scan along the x axis finds a jump point is a jump point too.
+
+      :param x: The x coordinate of the scan.
+      :param y: The y coordinate of the first cell of the scan.
+      :param dy: The direction of the scan, 1 or -1.
+      :return: The y coordinate of the jump point, or None if a wall or the border is reached first.
+      """
+        end_x, end_y = self.end_position
+        is_open = self.is_open
+        while is_open(x, y):
+            if (x == end_x and y == end_y) or \
+                    (is_open(x-1, y) and not is_open(x-1, y-dy)) or \
+                    (is_open(x+1, y) and not is_open(x+1, y-dy)) or \
+                    self.jump_x(x+1, y, 1) is not None or self.jump_x(x-1, y, -1) is not None:
+                return y
+            y += dy
+
+        return None
+
+    def directions(self, x, y, parent_x, parent_y):
+        """
+      Returns the directions worth scanning from a jump point. Coming along one axis, the scan continues forwards and turns to both sides, it never goes back.
+
+      :param x: The x coordinate of the jump point.
+      :param y: The y coordinate of the jump point.
+      :param parent_x: The x coordinate of the jump point it was reached from, None for the start position.
+      :param parent_y: The y coordinate of the jump point it was reached from, None for the start position.
+      :return: A list of (dx, dy) directions.
+      """
+        if parent_x is None:
+            return [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        if x != parent_x:
+            return [(1 if x > parent_x else -1, 0), (0, -1), (0, 1)]
+        return [(0, 1 if y > parent_y else -1), (-1, 0), (1, 0)]
+
+    def iter_indices(self):
+        """
+      Solves the maze with an A* search over jump points.
+
+      :return: A generator of the flat indices of the expanded jump points, the solution path is stored in `path`.
+      """
+        size = self.width * self.height
+        height = self.height
+        typecode = index_typecode(size)
+        self.path = None
+        if not self.reachable():
+            return None
+
+        parent = self.cell_array(typecode, -1)
+        cost = self.cell_array("i", -1)
+        closed = self.cell_array()
+        counter = itertools.count()
+        end_x, end_y = self.end_position
+        goal = self.index(self.end_position)
+        node = self.index(self.start_position)
+        cost[node] = 0
+        frontier = [(abs(self.start_position[0] - end_x) + abs(self.start_position[1] - end_y), next(counter), 0, node)]
+
+        while frontier:
+            _, _, step, node = heapq.heappop(frontier)
+            if closed[node] or step != cost[node]:
+                continue
+            closed[node] = 1
+            yield node
+            if node == goal:
+                break
+
+            x, y = divmod(node, height)
+            parent_x, parent_y = (None, None) if parent[node] == -1 else divmod(parent[node], height)
+            for dx, dy in self.directions(x, y, parent_x, parent_y):
+                if dx:
+                    jump_x = self.jump_x(x + dx, y, dx)
+                    if jump_x is None:
+                        continue
+                    jump_y = y
+                else:
+                    jump_y = self.jump_y(x, y + dy, dy)
+                    if jump_y is None:
+                        continue
+                    jump_x = x
+
+                jump = jump_x * height + jump_y
+                jump_cost = step + abs(jump_x - x) + abs(jump_y - y)
+                if closed[jump] or (cost[jump] != -1 and cost[jump] <= jump_cost):
+                    continue
+                cost[jump] = jump_cost
+                parent[jump] = node
+                heapq.heappush(frontier, (jump_cost + abs(jump_x - end_x) + abs(jump_y - end_y), next(counter), jump_cost, jump))
+
+        else:
+            return None
+
+        path = array(typecode)
+        while parent[node] != -1:
+            previous = parent[node]
+            delta = height if node - previous >= height else -height if previous - node >= height else 1 if node > previous else -1
+            while node != previous:
+                path.append(node)
+                node -= delta
+
+        path.reverse()
+        self.path = path
+        return path
+
+class BidirectionalSearch(Search):
+    """
+   This class represents a search growing from both the start and the end position. It inherits from Search and implements the joining of the two search trees, subclasses implement iter_indices. The visited states of both searches are merged in the order they are expanded.
+   """
+    def join_path(self, parents, meeting, typecode):
+        """
+      Returns the path through the cell where the two search trees meet.
+
+      :param parents: A tuple of the parent arrays of the search from the start and of the search from the end.
+      :param meeting: The flat index of a cell contained in both search trees.
+      :param typecode: The typecode of the returned array.
+      :return: The array of flat indices of the path, without the start position and with the end position.
+      """
+        path = array(typecode)
+        node = meeting
+        while parents[0][node] != -1:
+            path.append(node)
+            node = parents[0][node]
+
+        path.reverse()
+        node = parents[1][meeting]
+        while node != -1:
+            path.append(node)
+            node = parents[1][node]
+
+        return path
+
+class BidirectionalBFSearch(BidirectionalSearch):
+    """
+   This class represents a bidirectional breadth-first search algorithm for solving mazes. It inherits from BidirectionalSearch and expands one whole layer at a time from the side with the smaller layer, stopping after the layer in which the two searches meet.
+   """
+    def iter_indices(self):
+        """
+      Solves the maze by growing breadth-first searches from the start and the end position until they meet.
+
+      :return: A generator of the flat indices of the visited cells, the solution path is stored in `path`.
+      """
+        size = self.width * self.height
+        typecode = index_typecode(size)
+        self.path = None
+        if not self.reachable():
+            return None
+
+        ends = (self.index(self.start_position), self.index(self.end_position))
+        parents = (self.cell_array(typecode, -1), self.cell_array(typecode, -1))
+        costs = (self.cell_array("i", -1), self.cell_array("i", -1))
+        layers = [[ends[0]], [ends[1]]]
+        costs[0][ends[0]] = 0
+        costs[1][ends[1]] = 0
+        best = 0 if ends[0] == ends[1] else -1
+        meeting = ends[0]
+
+        while best == -1 and layers[0] and layers[1]:
+            side = 0 if len(layers[0]) <= len(layers[1]) else 1
+            cost, parent = costs[side], parents[side]
+            other = costs[1 - side]
+            layer = []
+
+            for node in layers[side]:
+                yield node
+                step = cost[node] + 1
+                for neighbor in self.neighbor_indices(node):
+                    if cost[neighbor] != -1:
+                        continue
+                    cost[neighbor] = step
+                    parent[neighbor] = node
+                    layer.append(neighbor)
+                    if other[neighbor] != -1 and (best == -1 or step + other[neighbor] < best):
+                        best = step + other[neighbor]
+                        meeting = neighbor
+
+            layers[side] = layer
+
+        if best == -1:
+            return None
+
+        self.path = self.join_path(parents, meeting, typecode)
+        return self.path
+
+class BidirectionalAstarSearch(BidirectionalSearch):
+    """
+   This class represents a bidirectional A* search algorithm for solving mazes. It inherits from BidirectionalSearch and runs an A* search from the start towards the end and one from the end towards the start, always expanding the side with the smaller frontier. The search stops once the best path found is no longer than the lowest estimate left in either frontier.
+   """
+    def get_distance(self, index, target):
+        """
+      Returns the distance between the given cell and a target cell.
+
+      :param index: The flat index of the cell.
+      :param target: The target position.
+      :return: The Manhattan distance between the cell and the target.
+      """
+        x, y = divmod(index, self.height)
+        return abs(x - target[0]) + abs(y - target[1])
+
+    def iter_indices(self):
+        """
+      Solves the maze by growing A* searches from the start and the end position until the shortest path through their meeting cells is proven.
+
+      :return: A generator of the flat indices of the visited cells, the solution path is stored in `path`.
+      """
+        size = self.width * self.height
+        typecode = index_typecode(size)
+        self.path = None
+        if not self.reachable():
+            return None
+
+        targets = (self.end_position, self.start_position)
+        ends = (self.index(self.start_position), self.index(self.end_position))
+        parents = (self.cell_array(typecode, -1), self.cell_array(typecode, -1))
+        costs = (self.cell_array("i", -1), self.cell_array("i", -1))
+        closed = (self.cell_array(), self.cell_array())
+        counter = itertools.count()
+        frontiers = ([], [])
+        for side in (0, 1):
+            costs[side][ends[side]] = 0
+            frontiers[side].append((self.get_distance(ends[side], targets[side]), next(counter), 0, ends[side]))
+        best = 0 if ends[0] == ends[1] else -1
+        meeting = ends[0]
+
+        while True:
+            for side in (0, 1):
+                frontier = frontiers[side]
+                while frontier and (closed[side][frontier[0][3]] or frontier[0][2] != costs[side][frontier[0][3]]):
+                    heapq.heappop(frontier)
+            if not frontiers[0] or not frontiers[1]:
+                break
+            if best != -1 and best <= max(frontiers[0][0][0], frontiers[1][0][0]):
+                break
+
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            cost, parent, frontier = costs[side], parents[side], frontiers[side]
+            other = costs[1 - side]
+
+            _, _, step, node = heapq.heappop(frontier)
+            closed[side][node] = 1
+            yield node
+            step += 1
+            for neighbor in self.neighbor_indices(node):
+                if closed[side][neighbor] or (cost[neighbor] != -1 and cost[neighbor] <= step):
+                    continue
+                cost[neighbor] = step
+                parent[neighbor] = node
+                heapq.heappush(frontier, (step + self.get_distance(neighbor, targets[side]), next(counter), step, neighbor))
+                if other[neighbor] != -1 and (best == -1 or step + other[neighbor] < best):
+                    best = step + other[neighbor]
+                    meeting = neighbor
+
+        if best == -1:
+            return None
+
+        self.path = self.join_path(parents, meeting, typecode)
+        return self.path
+
+class WavefrontSearch(Search):
+    """
+   This class represents a breadth-first search that expands one whole wavefront per step with NumPy array operations instead of one cell at a time. It inherits from Search, builds the distance map from the start position up to the wavefront containing the end position and backtracks the path by descending the distances. The visited states are the reached cells wavefront by wavefront.
+   """
+    TILED = False
+
+    def iter_indices(self):
+        """
+      Solves the maze by expanding wavefronts from the start position until the end position is reached.
+
+      :return: A generator of the flat indices of the visited cells, the solution path is stored in `path`, None when the end position is not reached.
+      """
+        typecode = index_typecode(self.width * self.height)
+        self.path = None
+        if not self.reachable():
+            return None
+
+        distances, _, order = wavefront(self.maze.walls, self.start_position, self.end_position)
+        path = descend(distances, self.end_position)
+        yield from order.tolist()
+        if path is None:
+            return None
+
+        self.path = array(typecode, [self.index(state) for state in path])
+        return self.path
+
+class LPAstarSearch(Search):
+    """
+   This class represents a lifelong planning A* search algorithm for solving mazes whose walls change. It inherits from Search and keeps its g and rhs values and its priority queue between calls of search_solve, so after a few cells change only the part of the search tree affected by them is repaired instead of searching from scratch. Changed cells are found by comparing the grid with the walls seen on the previous call, or can be reported with update_cells. The visited states are the cells expanded by the last call.
+   """
+    INFINITY = 2**31 - 1
+    TILED = False
+
+    def __init__(self, maze: Maze):
+        """
+      Initializes a new LPAstarSearch object with the given maze.
+
+      :param maze: The maze to solve.
+      """
+        super().__init__(maze)
+        self.reset()
+
+    def reset(self):
+        """
+      Drops the state of the search, the next call of search_solve searches from scratch. Called when the size of the maze changes or the start or end position moves.
+      """
+        size = self.maze.width * self.maze.height
+        self.walls = self.maze.walls
+        self.cells = memoryview(self.walls.reshape(-1))
+        self.width = self.maze.width
+        self.height = self.maze.height
+        self.start_position = self.maze.starting_point
+        self.end_position = self.maze.ending_point
+        self.start = self.index(self.start_position)
+        self.goal = self.index(self.end_position)
+        self.open = bytearray((self.walls.reshape(-1) != 1).tobytes())
+        self.g = array("i", [self.INFINITY]) * size
+        self.rhs = array("i", [self.INFINITY]) * size
+        self.queue = []
+        self.keys = {}
+        self.rhs[self.start] = 0
+        self.reported = False
+        self.enqueue(self.start)
+
+    def adjacent(self, index):
+        """
+      Returns the flat indices of the cells next to the given cell, walls included.
+
+      :param index: The flat index of the cell.
+      :return: A list of flat indices of the adjacent cells.
+      """
+        height = self.height
+        neighbors = []
+        y = index % height
+
+        if index >= height:
+            neighbors.append(index-height)
+        if index < len(self.open)-height:
+            neighbors.append(index+height)
+        if y > 0:
+            neighbors.append(index-1)
+        if y < height-1:
+            neighbors.append(index+1)
+
+        return neighbors
+
+    def key(self, index):
+        """
+      Returns the priority of the given cell.
+
+      :param index: The flat index of the cell.
+      :return: A tuple of the estimated total cost through the cell and its cost from the start.
+      """
+        cost = min(self.g[index], self.rhs[index])
+        if cost == self.INFINITY:
+            return (self.INFINITY, self.INFINITY)
+        x, y = divmod(index, self.height)
+        return (cost + abs(x - self.end_position[0]) + abs(y - self.end_position[1]), cost)
+
+    def enqueue(self, index):
+        """
+      Queues the given cell with its current priority, an older entry of the cell is left in the heap and skipped when it comes up.
+
+      :param index: The flat index of the cell.
+      """
+        key = self.key(index)
+        self.keys[index] = key
+        heapq.heappush(self.queue, (key, index))
+
+    def update_vertex(self, index):
+        """
+      Recomputes the rhs value of the given cell from its neighbors and queues the cell if it became inconsistent.
+
+      :param index: The flat index of the cell.
+      """
+        if index != self.start:
+            best = self.INFINITY
+            if self.open[index]:
+                g, passable = self.g, self.open
+                for neighbor in self.adjacent(index):
+                    if passable[neighbor] and g[neighbor] < best:
+                        best = g[neighbor]
+            self.rhs[index] = best if best == self.INFINITY else best + 1
+
+        if self.g[index] != self.rhs[index]:
+            self.enqueue(index)
+        else:
+            self.keys.pop(index, None)
+
+    def update_cells(self, states):
+        """
+      Reports cells whose walls changed since the last search. The next search then trusts the reports and does not compare the whole grid, so every cell changed before it has to be reported.
+
+      :param states: The positions of the changed cells.
+      """
+        self.reported = True
+        if self.maze.walls is not self.walls:
+            self.walls = self.maze.walls
+            self.cells = memoryview(self.walls.reshape(-1))
+
+        for state in states:
+            index = self.index(state)
+            passable = self.cells[index] != 1
+            if self.open[index] == passable:
+                continue
+            self.open[index] = passable
+            self.update_vertex(index)
+            for neighbor in self.adjacent(index):
+                self.update_vertex(neighbor)
+
+    def compute_shortest_path(self):
+        """
+      Expands inconsistent cells in order of priority until the end position is consistent and no queued cell can improve it.
+
+      :return: A generator of the flat indices of the expanded cells, a cell is yielded once its neighbors are updated so the search can be abandoned between cells.
+      """
+        g, rhs, queue, keys, goal = self.g, self.rhs, self.queue, self.keys, self.goal
+
+        while True:
+            while queue and keys.get(queue[0][1]) != queue[0][0]:
+                heapq.heappop(queue)
+            if not queue or (queue[0][0] >= self.key(goal) and rhs[goal] == g[goal]):
+                break
+
+            _, node = heapq.heappop(queue)
+            del keys[node]
+            if g[node] > rhs[node]:
+                g[node] = rhs[node]
+            else:
+                g[node] = self.INFINITY
+                self.update_vertex(node)
+            for neighbor in self.adjacent(node):
+                self.update_vertex(neighbor)
+            yield node
+
+    def iter_indices(self):
+        """
+      Solves the maze, repairing the result of the previous call after walls changed. The changed walls are found by comparing the whole grid with the walls of the previous call, unless they were reported with update_cells.
+
+      :return: A generator of the flat indices of the cells expanded by this call, the solution path is stored in `path`.
+      """
+        maze = self.maze
+        if (maze.walls.shape != self.walls.shape or maze.starting_point != self.start_position
+                or maze.ending_point != self.end_position):
+            self.reset()
+        elif not self.reported:
+            changed = np.flatnonzero((maze.walls.reshape(-1) != 1) != np.frombuffer(self.open, dtype=bool))
+            self.update_cells([self.state(int(index)) for index in changed])
+
+        self.reported = False
+        self.path = None
+        yield from self.compute_shortest_path()
+        g = self.g
+        if g[self.goal] == self.INFINITY:
+            return None
+
+        path = array(index_typecode(len(self.open)))
+        node = self.goal
+        while node != self.start:
+            path.append(node)
+            node = min((neighbor for neighbor in self.adjacent(node) if self.open[neighbor]), key=g.__getitem__)
+
+        path.reverse()
+        self.path = path
+        return path
+
+class HPAstarSearch(Search):
+    """
+   This class represents a hierarchical path finding (HPA*) search for large mazes queried repeatedly. It inherits from Search and answers a query on the ClusterGraph of the maze: the start and end positions are connected to the nodes of their clusters, A* runs on the abstract graph and every abstract edge is refined into single steps by an AstarSearch inside its cluster. The graph is built on the first query of a maze and shared by later searches of the same maze, which only recompute the clusters whose walls changed. The paths are near-optimal: they only cross cluster borders at entrance transitions. The visited states are the expanded nodes of the abstract graph.
+   """
+    TILED = False
+    GRAPHS = weakref.WeakKeyDictionary()
+
+    def __init__(self, maze: Maze, cluster_size: int = 32):
+        """
+      Initializes a new HPAstarSearch object with the given maze, reusing the abstract graph of earlier searches of the maze.
+
+      :param maze: The maze to solve.
+      :param cluster_size: The side of a cluster in cells.
+      """
+        super().__init__(maze)
+        self.graph = self.GRAPHS.get(maze)
+        if self.graph is None or self.graph.cluster_size != cluster_size:
+            self.graph = self.GRAPHS[maze] = ClusterGraph(maze, cluster_size)
+
+    def refine(self, source, target):
+        """
+      Expands an abstract edge inside the cluster of its cells into single steps with an AstarSearch.
+
+      :param source: The flat index of the first cell of the edge.
+      :param target: The flat index of the last cell of the edge, in the cluster of the first one.
+      :return: The list of flat indices of the steps, without the source and with the target.
+      """
+        x0, x1, y0, y1 = self.graph.bounds(self.graph.cluster(source))
+        (source_x, source_y), (target_x, target_y) = self.state(source), self.state(target)
+        window = Maze.from_walls(np.ascontiguousarray(self.maze.walls[x0:x1, y0:y1]), (source_x - x0, source_y - y0),
+                                 (target_x - x0, target_y - y0))
+        path, _ = AstarSearch(window).search_indices()
+        return [(x0 + x) * self.height + y0 + y for x, y in (divmod(index, y1 - y0) for index in path)]
+
+    def iter_indices(self):
+        """
+      Solves the maze with an A* search over the abstract graph, then refines the abstract path.
+
+      :return: A generator of the flat indices of the expanded abstract nodes, the solution path is stored in `path`.
+      """
+        typecode = index_typecode(self.width * self.height)
+        graph = self.graph
+        graph.refresh()
+        self.path = None
+        start = self.index(self.start_position)
+        goal = self.index(self.end_position)
+        if not self.reachable():
+            return None
+
+        end_x, end_y = self.end_position
+        exits = dict(graph.connect(goal, [start]))
+        entries = graph.links(start) if start in graph.ordinals else graph.connect(start)
+        parent = {start: -1}
+        cost = {start: 0}
+        closed = set()
+        counter = itertools.count()
+        frontier = [(abs(self.start_position[0] - end_x) + abs(self.start_position[1] - end_y), next(counter), 0, start)]
+
+        while frontier:
+            _, _, step, node = heapq.heappop(frontier)
+            if node in closed or step != cost[node]:
+                continue
+            closed.add(node)
+            yield node
+            if node == goal:
+                break
+
+            edges = entries if node == start else graph.links(node)
+            if node in exits:
+                edges = edges + [(goal, exits[node])]
+            for neighbor, distance in edges:
+                if neighbor in closed or cost.get(neighbor, step + distance + 1) <= step + distance:
+                    continue
+                parent[neighbor] = node
+                cost[neighbor] = step + distance
+                x, y = divmod(neighbor, self.height)
+                heapq.heappush(frontier, (step + distance + abs(x - end_x) + abs(y - end_y), next(counter), step + distance, neighbor))
+
+        else:
+            return None
+
+        nodes = []
+        while node != -1:
+            nodes.append(node)
+            node = parent[node]
+        nodes.reverse()
+
+        path = array(typecode)
+        for source, target in zip(nodes, nodes[1:]):
+            if abs(source - target) in (1, self.height) and graph.cluster(source) != graph.cluster(target):
+                path.append(target)
+            else:
+                path.extend(self.refine(source, target))
+
+        self.path = path
+        return path
+
+
+SEARCHES = {
+    "DFS": DFSearch,
+    "BFS": BFSearch,
+    "GBFS": GBFSearch,
+    "A*": AstarSearch,
+    "JPS": JPSearch,
+    "BiBFS": BidirectionalBFSearch,
+    "BiA*": BidirectionalAstarSearch,
+    "Wave": WavefrontSearch,
+    "LPA*": LPAstarSearch,
+    "HPA*": HPAstarSearch,
+}
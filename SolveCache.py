@@ -0,0 +1,167 @@
+from Maze import Maze
+from collections import OrderedDict
+import hashlib
+import os
+import numpy as np
+
+
+class SolveCache:
+    """
+    This class represents a least recently used cache of search results. Results are keyed by a hash of the maze walls, the starting and ending points and the algorithm, and are stored as int32 arrays so the memory budget can be enforced exactly.
+    """
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 2**20, directory: str = None):
+        """
+        Initializes a new empty SolveCache object.
+
+        :param max_entries: The maximum number of results kept in memory.
+        :param max_bytes: The maximum number of bytes used by the results kept in memory.
+        :param directory: Optional directory where results are also persisted, None to keep them in memory only.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, maze: Maze, method: str):
+        """
+        Returns the key of a maze and an algorithm.
+
+        :param maze: The maze to solve.
+        :param method: The name of the algorithm.
+        :return: A hexadecimal digest of the walls, their shape, the starting and ending points and the algorithm.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(maze.walls).data)
+        digest.update(repr((maze.walls.shape, maze.starting_point, maze.ending_point, method)).encode())
+        return digest.hexdigest()
+
+    def get(self, maze: Maze, method: str):
+        """
+        Returns the cached result of an algorithm on a maze.
+
+        :param maze: The maze to solve.
+        :param method: The name of the algorithm.
+        :return: A tuple containing the solution path and the list of visited states, or None if the result is not cached.
+        """
+        key = self.key(maze, method)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            solution, visited = self.entries[key]
+        elif self.directory is not None and os.path.exists(self.path(key)):
+            with np.load(self.path(key)) as arrays:
+                solution = arrays["solution"] if "solution" in arrays else None
+                visited = arrays["visited"]
+            self.store(key, solution, visited)
+        else:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return (self.unpack(solution), self.unpack(visited))
+
+    def put(self, maze: Maze, method: str, solution, visited):
+        """
+        Adds the result of an algorithm on a maze to the cache.
+
+        :param maze: The solved maze.
+        :param method: The name of the algorithm.
+        :param solution: The solution path, None if the maze has no solution.
+        :param visited: The list of visited states.
+        """
+        key = self.key(maze, method)
+        solution = None if solution is None else self.pack(solution)
+        visited = self.pack(visited)
+        self.store(key, solution, visited)
+
+        if self.directory is not None:
+            arrays = {"visited": visited} if solution is None else {"solution": solution, "visited": visited}
+            np.savez(self.path(key), **arrays)
+
+    def solve(self, maze: Maze, method: str, search_class):
+        """
+        Returns the result of an algorithm on a maze, solving it only if it is not cached yet.
+
+        :param maze: The maze to solve.
+        :param method: The name of the algorithm.
+        :param search_class: The Search subclass implementing the algorithm.
+        :return: A tuple containing the solution path and the list of visited states.
+        """
+        result = self.get(maze, method)
+        if result is None:
+            result = search_class(maze).search_solve()
+            self.put(maze, method, *result)
+        return result
+
+    def store(self, key, solution, visited):
+        """
+        Keeps a packed result in memory and evicts the least recently used results until the cache fits its bounds. A result larger than the whole memory budget is not kept.
+
+        :param key: The key of the result.
+        :param solution: The packed solution path or None.
+        :param visited: The packed visited states.
+        """
+        if key in self.entries:
+            self.size -= self.nbytes(self.entries.pop(key))
+
+        entry = (solution, visited)
+        if self.nbytes(entry) > self.max_bytes:
+            return
+
+        self.entries[key] = entry
+        self.size += self.nbytes(entry)
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self.size -= self.nbytes(self.entries.popitem(last=False)[1])
+
+    def clear(self):
+        """
+        Removes all results from memory. Persisted results are kept.
+        """
+        self.entries.clear()
+        self.size = 0
+
+    def path(self, key):
+        """
+        Returns the file a result is persisted to.
+
+        :param key: The key of the result.
+        :return: The path of the file.
+        """
+        return os.path.join(self.directory, key + ".npz")
+
+    @staticmethod
+    def nbytes(entry):
+        """
+        Returns the number of bytes used by a packed result.
+
+        :param entry: A tuple of the packed solution path and visited states.
+        :return: The number of bytes.
+        """
+        return sum(array.nbytes for array in entry if array is not None)
+
+    @staticmethod
+    def pack(states):
+        """
+        Packs a list of states into an int32 array of shape (n, 2).
+
+        :param states: The list of states.
+        :return: The packed array.
+        """
+        return np.array(states, dtype=np.int32).reshape(-1, 2)
+
+    @staticmethod
+    def unpack(states):
+        """
+        Unpacks an array of states into a list of tuples.
+
+        :param states: The packed array or None.
+        :return: The list of states or None.
+        """
+        if states is None:
+            return None
+        return list(map(tuple, states.tolist()))
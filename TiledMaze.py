@@ -0,0 +1,369 @@
+from MazeFile import HEADER, MAGIC, VERSION, PACKED, OFFSET, read_header, replacing
+from collections import OrderedDict
+import numpy as np
+
+
+class TiledWalls:
+    """
+    Walls of a maze split into square chunks that are loaded on demand and kept in a least recently used cache, so only
+    a fixed number of chunks is held in memory however large the maze is. Cells are read like the flat memoryview of
+    Maze.walls, by flat index x * height + y, or by (x, y) position.
+    .............
+    Attributes:
+        shape: width and height of the maze
+        chunk_size: side of a chunk in cells
+        capacity: number of chunks kept in the cache
+        hits: cell reads served by a cached chunk
+        misses: cell reads that had to load their chunk
+    Methods:
+        __getitem__: Returns the cell at a flat index or a position.
+        __setitem__: Changes the cell at a position, changed chunks are never dropped.
+        fetch: Loads a chunk into the cache.
+        stats: Returns the chunk cache statistics.
+        close: Releases the source of the chunks.
+    """
+    def __init__(self, shape: tuple, chunk_size: int, load, capacity: int):
+        """
+        Initializes the walls with an empty cache.
+        .............
+        Input:
+            shape: Width and height of the maze
+            chunk_size: Side of a chunk in cells
+            load: Function returning the chunk at (x, y, chunk_size) as a bytearray of chunk_size * chunk_size cells
+                  in (x, y) order, cells outside the maze are walls. A close attribute, if any, releases its source
+            capacity: Number of chunks kept in the cache
+        """
+        self.shape = shape
+        self.width, self.height = shape
+        self.chunk_size = chunk_size
+        self.rows = -(-self.height // chunk_size)
+        self.load = load
+        self.capacity = max(capacity, 1)
+        self.chunks = OrderedDict()
+        self.edited = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.width * self.height
+
+    def __getitem__(self, index):
+        """
+        Returns the cell at a flat index or a position.
+        .............
+        Input:
+            index: Flat index x * height + y, or position (x, y)
+        Output:
+            1 for a wall, 0 for an open cell
+        """
+        x, y = index if type(index) is tuple else divmod(index, self.height)
+        size = self.chunk_size
+        key = x // size * self.rows + y // size
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.fetch(key)
+        else:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+        return chunk[x % size * size + y % size]
+
+    def __setitem__(self, position, value):
+        """
+        Changes the cell at a position. Changed chunks are kept when they leave the cache, the source is never written.
+        .............
+        Input:
+            position: Position (x, y)
+            value: 1 for a wall, 0 for an open cell
+        """
+        x, y = position
+        size = self.chunk_size
+        key = x // size * self.rows + y // size
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.fetch(key)
+        chunk[x % size * size + y % size] = value
+        self.edited[key] = chunk
+
+    def fetch(self, key: int):
+        """
+        Loads a chunk into the cache, dropping the least recently used chunk when the cache is full.
+        .............
+        Input:
+            key: Number of the chunk, chunk_x * rows + chunk_y
+        Output:
+            The chunk as a bytearray
+        """
+        self.misses += 1
+        chunk = self.edited.get(key)
+        if chunk is None:
+            x, y = divmod(key, self.rows)
+            chunk = self.load(x * self.chunk_size, y * self.chunk_size, self.chunk_size)
+
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.capacity:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def stats(self):
+        """
+        Returns the chunk cache statistics.
+        .............
+        Output:
+            Dictionary with the hits, misses, hit rate, cached and edited chunks and the bytes held by the cache
+        """
+        reads = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / reads if reads else None,
+            "cached_chunks": len(self.chunks),
+            "edited_chunks": len(self.edited),
+            "cached_bytes": len(self.chunks) * self.chunk_size ** 2,
+        }
+
+    def close(self):
+        """
+        Releases the source of the chunks, e.g. the open maze file. Cached and changed chunks can still be read.
+        """
+        close = getattr(self.load, "close", None)
+        if close is not None:
+            close()
+
+
+def noise_chunks(shape: tuple, coverage: float, seed: int):
+    """
+    Returns a chunk loader generating the noise of Maze.generate_maze chunk by chunk. Every chunk is drawn from its own
+    generator seeded with the seed and the chunk position, so a chunk is the same whenever it is loaded again.
+    INPUT:
+        shape: tuple
+            width and height of the maze
+        coverage: float
+            coverage ratio for maze generation
+        seed: int
+            seed of the maze
+    OUTPUT:
+        load: callable
+            the chunk loader for TiledWalls
+    """
+    width, height = shape
+
+    def load(x, y, size):
+        draw = np.random.default_rng((seed, x, y)).random((size, size), dtype=np.float32)
+        chunk = (draw > coverage).view(np.uint8)
+        chunk[max(width - x, 0):] = 1
+        chunk[:, max(height - y, 0):] = 1
+        return bytearray(chunk.tobytes())
+
+    return load
+
+
+def file_chunks(path: str, header: dict):
+    """
+    Returns a chunk loader reading the walls of a binary maze file, one row of a chunk per read, byte or packed grids.
+    The file stays open until the close attribute of the loader is called
+    INPUT:
+        path: str
+            the maze file written by MazeFile.write_maze
+        header: dict
+            the header of the file as returned by MazeFile.read_header
+    OUTPUT:
+        load: callable
+            the chunk loader for TiledWalls
+    """
+    width, height, packed = header["width"], header["height"], header["packed"]
+    file = open(path, "rb")
+
+    def load(x, y, size):
+        chunk = bytearray(b"\x01") * (size * size)
+        count = min(size, height - y)
+        for row in range(min(size, width - x)):
+            start = (x + row) * height + y
+            if packed:
+                file.seek(OFFSET + start // 8)
+                bits = np.unpackbits(np.frombuffer(file.read((start % 8 + count + 7) // 8), dtype=np.uint8))
+                chunk[row * size:row * size + count] = bits[start % 8:start % 8 + count].tobytes()
+            else:
+                file.seek(OFFSET + start)
+                file.readinto(memoryview(chunk)[row * size:row * size + count])
+        return chunk
+
+    load.close = file.close
+    return load
+
+
+class TiledMaze:
+    """
+    Class for mazes larger than memory. The walls are a TiledWalls cache over a binary maze file or over noise generated
+    chunk by chunk, and there is no overlay: the maze is meant to be solved, not displayed. The solvers of Search.py
+    read it transparently and keep their state in dictionaries, except the searches that need the whole grid.
+    A maze opened from a file holds it open until close is called, the maze can be used as a context manager for that.
+    .............
+    Methods:
+        __init__: Initializes the maze around tiled walls.
+        from_file: Opens a binary maze file without reading its walls.
+        from_noise: Creates a maze of random noise generated on demand.
+        is_reachable: Checks whether two cells can be connected.
+        set_wall: Adds or removes a wall.
+        stats: Returns the chunk cache statistics.
+        save: Writes the maze to a binary maze file one strip of chunks at a time.
+        close: Closes the file the walls are read from.
+    """
+    def __init__(self, walls: TiledWalls, starting_point: tuple, ending_point: tuple, seed: int = None,
+                 coverage: float = None):
+        """
+        Initializes the maze around tiled walls.
+        .............
+        Input:
+            walls: The tiled walls
+            starting_point: Starting point position
+            ending_point: Ending point position
+            seed: Seed the maze was generated with, None if unknown
+            coverage: Coverage ratio the maze was generated with, None if unknown
+        """
+        self.walls = walls
+        self.width, self.height = walls.shape
+        self.aspect_ratio = self.width / self.height
+        self.starting_point = starting_point
+        self.ending_point = ending_point
+        self.seed = seed
+        self.coverage = coverage
+
+    @classmethod
+    def from_file(cls, path: str, chunk_size: int = 256, capacity: int = 64):
+        """
+        Opens a binary maze file, its walls are read chunk by chunk when a solver reaches them.
+        .............
+        Input:
+            path: The maze file written by MazeFile.write_maze or TiledMaze.save
+            chunk_size: Side of a chunk in cells
+            capacity: Number of chunks kept in the cache
+        Output:
+            TiledMaze object
+        """
+        header = read_header(path)
+        walls = TiledWalls((header["width"], header["height"]), chunk_size, file_chunks(path, header), capacity)
+        return cls(walls, header["starting_point"], header["ending_point"], header["seed"], header["coverage"])
+
+    @classmethod
+    def from_noise(cls, size: int, coverage: float, aspect_ratio: float, seed: int = None, chunk_size: int = 256,
+                   capacity: int = 64):
+        """
+        Creates a maze of random noise like Maze, generated chunk by chunk when a solver reaches it.
+        The starting and ending points are random open cells of random chunks, they are not checked to be connected.
+        .............
+        Input:
+            size: Size of the maze
+            coverage: Coverage ratio for maze generation
+            aspect_ratio: Aspect ratio for maze dimensions
+            seed: Seed of the maze, None for a fresh one
+            chunk_size: Side of a chunk in cells
+            capacity: Number of chunks kept in the cache
+        Output:
+            TiledMaze object
+        """
+        rng = np.random.default_rng(seed)
+        seed = int(rng.integers(2**63)) if seed is None else seed
+        shape = (int(size * aspect_ratio), size)
+        walls = TiledWalls(shape, chunk_size, noise_chunks(shape, coverage, seed), capacity)
+        columns = -(-shape[0] // chunk_size)
+
+        points = []
+        while len(points) < 2:
+            for key in rng.permutation(columns * walls.rows).tolist():
+                x, y = divmod(key, walls.rows)
+                cells = np.flatnonzero(np.frombuffer(walls.fetch(key), dtype=np.uint8) != 1)
+                for point_x, point_y in points:
+                    if (point_x // chunk_size, point_y // chunk_size) == (x, y):
+                        cells = cells[cells != point_x % chunk_size * chunk_size + point_y % chunk_size]
+                if cells.size:
+                    cell_x, cell_y = divmod(int(cells[rng.integers(cells.size)]), chunk_size)
+                    points.append((x * chunk_size + cell_x, y * chunk_size + cell_y))
+                    break
+            else:
+                raise ValueError("the maze has no open cell left to place the point on")
+
+        return cls(walls, points[0], points[1], seed, coverage)
+
+    def is_reachable(self, source, target, compute: bool = True):
+        """
+        Checks whether two cells can be connected. Labelling the components would read the whole maze, so only walls
+        are ruled out and the search finds out the rest.
+        .............
+        Input:
+            source: First cell position
+            target: Second cell position
+            compute: Ignored, the components of a tiled maze are never labelled
+        Output:
+            False if either cell is a wall, True otherwise
+        """
+        return self.walls[source] != 1 and self.walls[target] != 1
+
+    def set_wall(self, position, wall: bool = True):
+        """
+        Adds or removes a wall, the change is kept in memory and never written to the source.
+        .............
+        Input:
+            position: Cell position
+            wall: True to add a wall, False to remove it
+        """
+        self.walls[position] = int(wall)
+
+    def stats(self):
+        """
+        Returns the chunk cache statistics.
+        .............
+        Output:
+            Dictionary with the hits, misses, hit rate, cached and edited chunks and the bytes held by the cache
+        """
+        return self.walls.stats()
+
+    def save(self, path: str, packed: bool = False):
+        """
+        Writes the maze to a binary maze file, one strip of chunks along y at a time, so saving never holds more than
+        a strip in memory. The file can be opened by MazeFile.load and TiledMaze.from_file, and can be the file the maze
+        was opened from.
+        .............
+        Input:
+            path: The file to write
+            packed: Store 8 cells per byte
+        """
+        walls = self.walls
+        size = walls.chunk_size
+        seed = -1 if self.seed is None else self.seed
+        coverage = float("nan") if self.coverage is None else self.coverage
+        header = HEADER.pack(MAGIC, VERSION, PACKED if packed else 0, self.width, self.height, *self.starting_point,
+                             *self.ending_point, seed, coverage)
+
+        with replacing(path) as file:
+            file.write(header.ljust(OFFSET, b"\0"))
+            bits = np.zeros(0, dtype=np.uint8)
+            for x in range(0, self.width, size):
+                strip = np.empty((size, walls.rows * size), dtype=np.uint8)
+                for row in range(walls.rows):
+                    key = x // size * walls.rows + row
+                    chunk = walls.edited.get(key) or walls.chunks.get(key) or walls.load(x, row * size, size)
+                    strip[:, row * size:(row + 1) * size] = np.frombuffer(chunk, dtype=np.uint8).reshape(size, size)
+                strip = strip[:min(size, self.width - x), :self.height].reshape(-1)
+
+                if packed:
+                    bits = np.concatenate((bits, strip))
+                    whole = len(bits) - len(bits) % 8
+                    np.packbits(bits[:whole]).tofile(file)
+                    bits = bits[whole:]
+                else:
+                    strip.tofile(file)
+
+            if packed and len(bits):
+                np.packbits(bits).tofile(file)
+
+    def close(self):
+        """
+        Closes the file the walls are read from, chunks that are not cached can no longer be loaded.
+        """
+        self.walls.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
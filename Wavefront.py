@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def wavefront(grid: np.ndarray, source: tuple, target: tuple = None):
+    """
+    Computes the breadth-first distance of every cell from a source cell by expanding one whole wavefront per step
+    with array operations instead of one cell at a time. The wavefront is kept as an array of flat cell indices
+    (x * height + y), so every step costs time proportional to the wavefront and not to the whole grid.
+    INPUT:
+        grid: np.ndarray
+            cell states of the maze with shape (width, height), cells equal to 1 are walls
+        source: tuple
+            the cell the distances are measured from
+        target: tuple
+            optional cell at which to stop, the wavefront containing it is the last one expanded
+    OUTPUT:
+        distances: np.ndarray
+            int32 array of shape (width, height) with the number of steps from the source, -1 for unreached cells
+        parents: np.ndarray
+            array of shape (width, height) with the flat index of the predecessor of every reached cell on a
+            shortest path from the source, -1 for the source and unreached cells
+        order: np.ndarray
+            flat indices of the reached cells in the order they were reached, wavefront by wavefront
+    """
+    width, height = grid.shape
+    passable = grid.reshape(-1) != 1
+    distances = np.full(width * height, -1, dtype=np.int32)
+    parents = np.full(width * height, -1, dtype=np.int32 if width * height < 2**31 else np.int64)
+
+    start = source[0] * height + source[1]
+    goal = -1 if target is None else target[0] * height + target[1]
+    front = np.array([start], dtype=np.int64)
+    distances[start] = 0
+    reached = [front]
+    step = 0
+
+    while front.size and (goal == -1 or distances[goal] == -1):
+        step += 1
+        y = front % height
+        inside = (front >= height, front < width * height - height, y > 0, y < height - 1)
+        sources = np.concatenate([front[mask] for mask in inside])
+        neighbors = sources + np.repeat((-height, height, -1, 1), [np.count_nonzero(mask) for mask in inside])
+        new = passable[neighbors] & (distances[neighbors] == -1)
+        neighbors, first = np.unique(neighbors[new], return_index=True)
+        distances[neighbors] = step
+        parents[neighbors] = sources[new][first]
+        reached.append(neighbors)
+        front = neighbors
+
+    return distances.reshape(width, height), parents.reshape(width, height), np.concatenate(reached)
+
+
+def descend(distances: np.ndarray, target: tuple):
+    """
+    Backtracks a shortest path through a distance map by repeatedly stepping to a neighbour one step closer to the source
+    INPUT:
+        distances: np.ndarray
+            distance map as returned by wavefront
+        target: tuple
+            the cell the path leads to
+    OUTPUT:
+        path: list[tuple]
+            the cells of the path from the cell after the source to the target, None if the target was not reached
+    """
+    width, height = distances.shape
+    x, y = target
+    if distances[x, y] == -1:
+        return None
+
+    path = []
+    for step in range(int(distances[x, y]) - 1, -1, -1):
+        path.append((x, y))
+        for nx, ny in ((x-1, y), (x+1, y), (x, y-1), (x, y+1)):
+            if 0 <= nx < width and 0 <= ny < height and distances[nx, ny] == step:
+                x, y = nx, ny
+                break
+
+    path.reverse()
+    return path
@@ -0,0 +1,302 @@
+from Maze import Maze
+from Search import SEARCHES
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import numpy as np
+
+
+FIELDS = [
+    "job",
+    "size",
+    "width",
+    "height",
+    "coverage",
+    "aspect_ratio",
+    "seed",
+    "algorithm",
+    "seconds",
+    "nodes_expanded",
+    "path_length",
+    "error",
+]
+
+
+def pack_maze(maze: Maze):
+    """
+    Packs a maze into a compact picklable tuple for shipping to a worker process
+    INPUT:
+        maze: Maze
+            the maze to pack
+    OUTPUT:
+        packed: tuple
+            the wall bytes, the grid shape and the starting and ending points
+    """
+    return (np.ascontiguousarray(maze.walls).tobytes(), maze.walls.shape, maze.starting_point, maze.ending_point)
+
+
+def unpack_maze(packed: tuple):
+    """
+    Rebuilds a maze packed by pack_maze
+    INPUT:
+        packed: tuple
+            the wall bytes, the grid shape and the starting and ending points
+    OUTPUT:
+        maze: Maze
+    """
+    data, shape, starting_point, ending_point = packed
+    grid = np.frombuffer(data, dtype=np.uint8).reshape(shape)
+    return Maze.from_array(grid, starting_point, ending_point)
+
+
+def solve(maze: Maze, algorithms: list, keep_paths: bool = False):
+    """
+    Solves one maze with every algorithm. An algorithm that fails gives a record with the error instead of stopping
+    the other algorithms and the batch
+    INPUT:
+        maze: Maze
+            the maze to solve, it is not modified by the searches
+        algorithms: list[str]
+            keys of SEARCHES to run
+        keep_paths: bool
+            add the solution path as an int32 array of shape (n, 2) to every record
+    OUTPUT:
+        records: list[dict]
+            one record per algorithm with the wall time, nodes expanded and path length, or with the error
+    """
+    records = []
+    for algorithm in algorithms:
+        start = time.perf_counter()
+        try:
+            path, visited = SEARCHES[algorithm](maze).search_indices()
+        except Exception as error:
+            records.append({"width": maze.width, "height": maze.height, "algorithm": algorithm,
+                            "error": f"{type(error).__name__}: {error}"})
+            continue
+        seconds = time.perf_counter() - start
+
+        record = {
+            "width": maze.width,
+            "height": maze.height,
+            "algorithm": algorithm,
+            "seconds": seconds,
+            "nodes_expanded": len(visited),
+            "path_length": None if path is None else len(path),
+        }
+        if keep_paths:
+            record["path"] = None if path is None else np.array(divmod(np.array(path), maze.height), dtype=np.int32).T
+        records.append(record)
+
+    return records
+
+
+def solve_packed(job: int, packed: tuple, algorithms: list, keep_paths: bool):
+    """
+    Worker task solving a maze shipped by pack_maze
+    INPUT:
+        job: int
+            the number of the job, copied to the records
+        packed: tuple
+            the packed maze
+        algorithms: list[str]
+            keys of SEARCHES to run
+        keep_paths: bool
+            add the solution paths to the records
+    OUTPUT:
+        records: list[dict]
+    """
+    return [dict(job=job, **record) for record in solve(unpack_maze(packed), algorithms, keep_paths)]
+
+
+def solve_generated(job: int, size: int, coverage: float, aspect_ratio: float, seed: int, connected: bool,
+                    algorithms: list):
+    """
+    Worker task generating a maze from its parameters and solving it, so only the parameters cross the process boundary
+    INPUT:
+        job: int
+            the number of the job, copied to the records
+        size: int
+            size of the maze
+        coverage: float
+            coverage ratio for maze generation
+        aspect_ratio: float
+            aspect ratio for maze dimensions
+        seed: int
+            seed of the maze generator
+        connected: bool
+            place the starting and ending points in the same connected component
+        algorithms: list[str]
+            keys of SEARCHES to run
+    OUTPUT:
+        records: list[dict]
+            one record per algorithm, or a single record with the error if the maze cannot be generated
+    """
+    parameters = {"job": job, "size": size, "coverage": coverage, "aspect_ratio": aspect_ratio, "seed": seed}
+    try:
+        maze = Maze(size, coverage, aspect_ratio, seed=seed, connected=connected)
+    except ValueError as error:
+        return [dict(parameters, error=str(error))]
+
+    return [dict(parameters, **record) for record in solve(maze, algorithms)]
+
+
+def stream(function, jobs, workers: int = None):
+    """
+    Runs jobs on a process pool and yields their records as the jobs complete. At most a few jobs per worker are
+    submitted ahead, so arbitrarily long job iterables are consumed lazily.
+    INPUT:
+        function: callable
+            the worker task, it has to be a module level function returning a list of records
+        jobs: iterable[tuple]
+            the arguments of every task
+        workers: int
+            number of worker processes, defaults to the number of CPUs
+    OUTPUT:
+        record: dict
+            one record of a completed job
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            for arguments in jobs:
+                pending.add(executor.submit(function, *arguments))
+                if len(pending) >= 4 * workers:
+                    break
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def solve_mazes(mazes, algorithms: list, workers: int = None, keep_paths: bool = False):
+    """
+    Solves existing mazes on a process pool, the grids are shipped to the workers as bytes
+    INPUT:
+        mazes: iterable[Maze]
+            the mazes to solve
+        algorithms: list[str]
+            keys of SEARCHES to run on every maze
+        workers: int
+            number of worker processes, defaults to the number of CPUs
+        keep_paths: bool
+            add the solution paths to the records
+    OUTPUT:
+        record: dict
+            one record per maze and algorithm in order of completion, "job" is the position of the maze
+    """
+    jobs = ((job, pack_maze(maze), algorithms, keep_paths) for job, maze in enumerate(mazes))
+    return stream(solve_packed, jobs, workers)
+
+
+def batch(sizes: list, count: int, coverage: float, aspect_ratio: float, seed: int, algorithms: list,
+          connected: bool = False, workers: int = None):
+    """
+    Generates count mazes of every size in the worker processes and solves each with every algorithm
+    INPUT:
+        sizes: list[int]
+            maze sizes to generate
+        count: int
+            number of mazes per size, maze i of a size is generated with seed + i
+        coverage: float
+            coverage ratio for maze generation
+        aspect_ratio: float
+            aspect ratio for maze dimensions
+        seed: int
+            seed of the first maze of every size
+        algorithms: list[str]
+            keys of SEARCHES to run
+        connected: bool
+            place the starting and ending points in the same connected component
+        workers: int
+            number of worker processes, defaults to the number of CPUs
+    OUTPUT:
+        record: dict
+            one record with the keys of FIELDS per maze and algorithm in order of completion
+    """
+    jobs = ((job, size, coverage, aspect_ratio, seed + i, connected, algorithms)
+            for job, (size, i) in enumerate((size, i) for size in sizes for i in range(count)))
+    return stream(solve_generated, jobs, workers)
+
+
+def write_records(records, output, output_format: str):
+    """
+    Writes records as they complete
+    INPUT:
+        records: iterable[dict]
+            the batch records
+        output: file
+            the stream to write to
+        output_format: str
+            'jsonl' writes one JSON object per line, 'csv' writes a header row followed by one row per record
+    OUTPUT:
+        ....
+    """
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            output.flush()
+    else:
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments of the batch solver
+    INPUT:
+        argv: list[str]
+            the arguments, defaults to sys.argv
+    OUTPUT:
+        arguments: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Generate and solve many mazes on a process pool.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64], help="maze sizes (heights) to generate")
+    parser.add_argument("--count", type=int, default=100, help="number of mazes per size")
+    parser.add_argument("--coverage", type=float, default=0.7, help="coverage ratio for maze generation")
+    parser.add_argument("--aspect-ratio", type=float, default=1.0, help="aspect ratio for maze dimensions")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze of every size")
+    parser.add_argument("--connected", action="store_true",
+                        help="place the starting and ending points in the same connected component")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SEARCHES), default=["DFS", "BFS", "GBFS", "A*"],
+                        help="algorithms to run on every maze")
+    parser.add_argument("--workers", type=int, help="number of worker processes, defaults to the number of CPUs")
+    parser.add_argument("--format", dest="output_format", choices=["jsonl", "csv"], default="jsonl",
+                        help="output format")
+    parser.add_argument("--output", help="file to write the results to, defaults to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    the main function for the batch solver
+    INPUT:
+        argv: list[str]
+            the command line arguments, defaults to sys.argv
+    OUTPUT:
+        ....
+    """
+    arguments = parse_arguments(argv)
+    records = batch(arguments.sizes, arguments.count, arguments.coverage, arguments.aspect_ratio, arguments.seed,
+                    arguments.algorithms, arguments.connected, arguments.workers)
+
+    if arguments.output is None:
+        write_records(records, sys.stdout, arguments.output_format)
+    else:
+        with open(arguments.output, "w", newline="") as output:
+            write_records(records, output, arguments.output_format)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+from Maze import Maze
+from Generators import GENERATORS
+from TiledMaze import TiledMaze
+from Search import SEARCHES
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+
+FIELDS = [
+    "size",
+    "width",
+    "height",
+    "coverage",
+    "aspect_ratio",
+    "seed",
+    "connected",
+    "generator",
+    "braid",
+    "chunk_size",
+    "algorithm",
+    "repetitions",
+    "generate_seconds",
+    "min_seconds",
+    "mean_seconds",
+    "nodes_expanded",
+    "path_length",
+    "peak_memory_bytes",
+    "setup_seconds",
+    "setup_peak_memory_bytes",
+    "chunk_hit_rate",
+]
+
+
+def measure(search_class, maze: Maze, repetitions: int):
+    """
+    Solves a maze several times with one algorithm and measures the runs. Searches caching a precomputed structure
+    per maze in GRAPHS, like HPA*, have it built once from scratch and measured apart, the timed runs then reuse it
+    INPUT:
+        search_class: type
+            the Search subclass to benchmark
+        maze: Maze
+            the maze to solve, it is not modified by the search
+        repetitions: int
+            how many timed runs to make
+    OUTPUT:
+        result: dict
+            wall times of the timed runs, nodes expanded, path length and the peak memory
+            allocated by one extra run made under tracemalloc, and the wall time and peak memory of the
+            precomputation, None for searches without one
+    """
+    setup = {"setup_seconds": None, "setup_peak_memory_bytes": None}
+    graphs = getattr(search_class, "GRAPHS", None)
+    if graphs is not None:
+        graphs.pop(maze, None)
+        tracemalloc.start()
+        search_class(maze)
+        setup["setup_peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        graphs.pop(maze, None)
+        start = time.perf_counter()
+        search_class(maze)
+        setup["setup_seconds"] = time.perf_counter() - start
+
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        solution, visited = search_class(maze).search_solve()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    search_class(maze).search_solve()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "min_seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "nodes_expanded": len(visited),
+        "path_length": None if solution is None else len(solution),
+        "peak_memory_bytes": peak,
+        **setup,
+    }
+
+
+def benchmark(sizes: list, coverage: float, aspect_ratio: float, seed: int, algorithms: list, repetitions: int,
+              connected: bool = False, generator: str = None, braid: float = 0.0, chunk_size: int = None,
+              chunks: int = 64):
+    """
+    Runs every algorithm on one maze of every size and yields one record per run
+    INPUT:
+        sizes: list[int]
+            maze sizes of the sweep
+        coverage: float
+            coverage ratio for maze generation
+        aspect_ratio: float
+            aspect ratio for maze dimensions
+        seed: int
+            seed of the maze generator
+        algorithms: list[str]
+            keys of SEARCHES to run
+        repetitions: int
+            how many timed runs to make for every algorithm
+        connected: bool
+            place the starting and ending points in the same connected component
+        generator: str
+            key of GENERATORS building perfect mazes, None for random noise of the given coverage
+        braid: float
+            share of the dead ends of a perfect maze to remove
+        chunk_size: int
+            solve tiled noise mazes generated in chunks of this side instead of mazes held in memory, the searches that
+            need the whole grid are skipped
+        chunks: int
+            number of chunks kept in the cache of a tiled maze
+    OUTPUT:
+        record: dict
+            one benchmark record with the keys of FIELDS
+    """
+    for size in sizes:
+        start = time.perf_counter()
+        if chunk_size:
+            maze = TiledMaze.from_noise(size, coverage, aspect_ratio, seed, chunk_size, chunks)
+        else:
+            maze = Maze(size, coverage, aspect_ratio, seed=seed, connected=connected, generator=generator, braid=braid)
+        generate_seconds = time.perf_counter() - start
+
+        for algorithm in algorithms:
+            if chunk_size and not SEARCHES[algorithm].TILED:
+                continue
+            record = {
+                "size": size,
+                "width": maze.width,
+                "height": maze.height,
+                "coverage": coverage,
+                "aspect_ratio": aspect_ratio,
+                "seed": seed,
+                "connected": connected,
+                "generator": generator,
+                "braid": braid,
+                "chunk_size": chunk_size,
+                "algorithm": algorithm,
+                "repetitions": repetitions,
+                "generate_seconds": generate_seconds,
+            }
+            if chunk_size:
+                maze.walls.hits = maze.walls.misses = 0
+            record.update(measure(SEARCHES[algorithm], maze, repetitions))
+            record["chunk_hit_rate"] = maze.stats()["hit_rate"] if chunk_size else None
+            yield record
+
+
+def write_records(records, output, output_format: str):
+    """
+    Writes benchmark records as they are produced
+    INPUT:
+        records: iterable[dict]
+            the benchmark records
+        output: file
+            the stream to write to
+        output_format: str
+            'json' writes a JSON list, 'csv' writes a header row followed by one row per record
+    OUTPUT:
+        ....
+    """
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            output.flush()
+    else:
+        json.dump(list(records), output, indent=2)
+        output.write("\n")
+
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments of the benchmark
+    INPUT:
+        argv: list[str]
+            the arguments, defaults to sys.argv
+    OUTPUT:
+        arguments: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the maze search algorithms without the GUI.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256, 512, 1024],
+                        help="maze sizes (heights) of the sweep")
+    parser.add_argument("--coverage", type=float, default=0.7, help="coverage ratio for maze generation")
+    parser.add_argument("--aspect-ratio", type=float, default=1.0, help="aspect ratio for maze dimensions")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the maze generator")
+    parser.add_argument("--connected", action="store_true",
+                        help="place the starting and ending points in the same connected component")
+    parser.add_argument("--generator", choices=list(GENERATORS),
+                        help="build perfect mazes with this generator instead of random noise")
+    parser.add_argument("--braid", type=float, default=0.0, help="share of the dead ends of a perfect maze to remove")
+    parser.add_argument("--chunk-size", type=int,
+                        help="solve tiled noise mazes generated on demand in square chunks of this side")
+    parser.add_argument("--chunks", type=int, default=64, help="number of chunks kept in the cache of a tiled maze")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SEARCHES), default=list(SEARCHES),
+                        help="algorithms to run")
+    parser.add_argument("--repetitions", type=int, default=3, help="timed runs per algorithm and size")
+    parser.add_argument("--format", dest="output_format", choices=["json", "csv"], default="json",
+                        help="output format")
+    parser.add_argument("--output", help="file to write the results to, defaults to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    the main function for the headless benchmark
+    INPUT:
+        argv: list[str]
+            the command line arguments, defaults to sys.argv
+    OUTPUT:
+        ....
+    """
+    arguments = parse_arguments(argv)
+    records = benchmark(arguments.sizes, arguments.coverage, arguments.aspect_ratio, arguments.seed,
+                        arguments.algorithms, max(arguments.repetitions, 1), arguments.connected, arguments.generator,
+                        arguments.braid, arguments.chunk_size, arguments.chunks)
+
+    if arguments.output is None:
+        write_records(records, sys.stdout, arguments.output_format)
+    else:
+        with open(arguments.output, "w", newline="") as output:
+            write_records(records, output, arguments.output_format)
+
+
+
+if __name__ == '__main__':
+    main()